@@ -7,7 +7,8 @@ Access at: http://localhost:5000
 
 import os
 import sys
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+import json
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
 from functools import wraps
 from datetime import datetime
 from supabase import create_client
@@ -233,6 +234,18 @@ def view_logs():
     
     return render_template('logs.html', logs=logs, num_lines=num_lines, filter_level=filter_level)
 
+@app.route('/upstream')
+@login_required
+def view_upstream_status():
+    """Circuit breaker state of the bot's upstream endpoints"""
+    try:
+        with open(settings.UPSTREAM_STATUS_FILE, 'r', encoding='utf-8') as f:
+            return jsonify(json.load(f))
+    except FileNotFoundError:
+        return jsonify({"breakers": {}, "note": "No upstream failures recorded yet"})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/statistics')
 @login_required
 def view_statistics():
@@ -2,15 +2,19 @@
 # pylint: disable=unused-argument
 
 import logging
-import aiohttp
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import settings
-from utils import convert_to_azerbaijan_time, get_supabase_client, track_user, track_user_activity
+from utils import convert_kickoffs_to_azerbaijan_time, get_supabase_client, track_user, track_user_activity
 
 from service import *
+from upstream import upstream_client
+from models import player_registry, fixture_index_from, result_index_from, table_from, player_stats_from
+from render_cache import render_cache
+from photo_cache import PLAYER_PHOTO_DIR, photo_manifest, photo_file_ids
+from screens import MAIN_MENU_MARKUP, MAIN_MENU_TEXT, WELCOME_PROMPT, COMING_SOON_TEXT, COMING_SOON_MARKUP, HELP_TEXT, HELP_MARKUP, player_list
 
 if not settings.BOT_TOKEN:
     raise ValueError("BOT_TOKEN environment variable is required")
@@ -111,28 +115,65 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     user = update.message.from_user
     logger.info(f"User {user.id} ({user.first_name} {user.last_name or ''}) started the conversation.")
     
-    # Beautiful main menu with multiple options
-    keyboard = [
-        [
-            InlineKeyboardButton("📅 Təqvim", callback_data="Təqvim"),
-            InlineKeyboardButton("📊 Cədvəl", callback_data="table")
-        ],
-        [
-            InlineKeyboardButton("⚽ Son Nəticələr", callback_data="results"),
-            InlineKeyboardButton("👥 Oyunçular", callback_data="players")
-        ],
+    welcome_msg = f"**Salam, {user.first_name}!**\n\n" + WELCOME_PROMPT
+    
+    await update.message.reply_text(welcome_msg, reply_markup=MAIN_MENU_MARKUP, parse_mode='Markdown')
+    return START_ROUTES
+
+def render_fixtures(result, page):
+    """Message text and keyboard of a fixtures page"""
+    # Flattened matches, indexed once per cache version
+    index = fixture_index_from(result)
+
+    # Pagination settings
+    matches_per_page = 3
+    total_pages = index.total_pages(matches_per_page)
+
+    # Get matches for current page
+    page_matches, start_idx = index.page(page, matches_per_page)
+
+    msg = "<b>Qarşıdakı Oyunlar</b>\n"
+    msg += "═" * 25 + "\n\n"
+    msg += f"📅 Səhifə {page}/{total_pages}\n\n"
+
+    # Convert to Azerbaijan timezone (+4)
+    kickoffs = convert_kickoffs_to_azerbaijan_time(page_matches)
+
+    for i, (match, (az_date, az_time)) in enumerate(zip(page_matches, kickoffs), start_idx + 1):
+
+        # Add match status indicators
+        status_icon = "🟢" if not match.tbc else "🟡"
+        home_icon = "🏠" if match.is_home else "✈️"
+
+        msg += f"{status_icon} <b>Oyun {i}</b>\n"
+        msg += f"⚽ {match.home} vs {match.away}\n"
+        msg += f"{home_icon} {match.venue}\n"
+        msg += f"🏆 {match.competition}\n"
+        msg += f"📅 {az_date} - ⏰ {az_time}\n"
+        msg += "─" * 20 + "\n\n"
+
+    # Create pagination buttons
+    keyboard = []
+
+    # Navigation row
+    nav_row = []
+    if page > 1:
+        nav_row.append(InlineKeyboardButton("⬅️ Əvvəlki", callback_data=f"Təqvim_page_{page-1}"))
+    if page < total_pages:
+        nav_row.append(InlineKeyboardButton("Növbəti ➡️", callback_data=f"Təqvim_page_{page+1}"))
+    if nav_row:
+        keyboard.append(nav_row)
+
+    # Action buttons
+    keyboard.extend([
         [
-            InlineKeyboardButton("📺 Canlı Yayım", callback_data="live"),
-            InlineKeyboardButton("ℹ️ Haqqında", callback_data="about")
+            InlineKeyboardButton("◀️ Geri", callback_data="back_main"),
+            InlineKeyboardButton("🔄 Yenilə", callback_data="Təqvim")
         ]
-    ]
+    ])
     reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    welcome_msg = f"**Salam, {user.first_name}!**\n\n"
-    welcome_msg += "Nə görmək istəyirsiniz?\n\n"
-    
-    await update.message.reply_text(welcome_msg, reply_markup=reply_markup, parse_mode='Markdown')
-    return START_ROUTES
+    return msg, reply_markup
+
 
 async def fixtures(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Request Chelsea API and show beautiful fixture list with pagination."""
@@ -150,75 +191,11 @@ async def fixtures(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         page = int(query.data.split('_page_')[1])
 
     # Fetch data with intelligent caching
-    result = await fetch_with_cache(url=settings.CHELSEA_API_URL, cache_key="fixtures", max_age_hours=settings.FIXTURES_CACHE_HOURS)
+    result = await fetch_with_cache(url=settings.CHELSEA_API_URL, cache_key="fixtures", max_age_hours=settings.FIXTURES_CACHE_HOURS, grace_hours=settings.FIXTURES_CACHE_GRACE_HOURS)
 
     if result["success"]:
         try:
-            data = result["data"]
-
-            # Get all matches
-            all_matches = []
-            for item in data['items']:
-                for match in item['items']:
-                    all_matches.append(match)
-            
-            # Pagination settings
-            matches_per_page = 3
-            total_matches = len(all_matches)
-            total_pages = (total_matches + matches_per_page - 1) // matches_per_page
-            
-            # Get matches for current page
-            start_idx = (page - 1) * matches_per_page
-            end_idx = start_idx + matches_per_page
-            page_matches = all_matches[start_idx:end_idx]
-            
-            msg = "<b>Qarşıdakı Oyunlar</b>\n"
-            msg += "═" * 25 + "\n\n"
-            msg += f"📅 Səhifə {page}/{total_pages}\n\n"
-            
-            for i, match in enumerate(page_matches, start_idx + 1):
-                m = match['matchUp']
-                home = m['home']['clubShortName']
-                away = m['away']['clubShortName']
-                date = match['kickoffDate']
-                time = match['kickoffTime']
-                venue = match['venue']
-                comp = match['competition']
-                
-                # Convert to Azerbaijan timezone (+4)
-                az_date, az_time = convert_to_azerbaijan_time(date, time)
-                
-                # Add match status indicators
-                status_icon = "🟢" if not match.get('tbc', False) else "🟡"
-                home_icon = "🏠" if m['isHomeFixture'] else "✈️"
-                
-                msg += f"{status_icon} <b>Oyun {i}</b>\n"
-                msg += f"⚽ {home} vs {away}\n"
-                msg += f"{home_icon} {venue}\n"
-                msg += f"🏆 {comp}\n"
-                msg += f"📅 {az_date} - ⏰ {az_time}\n"
-                msg += "─" * 20 + "\n\n"
-            
-            # Create pagination buttons
-            keyboard = []
-            
-            # Navigation row
-            nav_row = []
-            if page > 1:
-                nav_row.append(InlineKeyboardButton("⬅️ Əvvəlki", callback_data=f"Təqvim_page_{page-1}"))
-            if page < total_pages:
-                nav_row.append(InlineKeyboardButton("Növbəti ➡️", callback_data=f"Təqvim_page_{page+1}"))
-            if nav_row:
-                keyboard.append(nav_row)
-            
-            # Action buttons
-            keyboard.extend([
-                [
-                    InlineKeyboardButton("◀️ Geri", callback_data="back_main"),
-                    InlineKeyboardButton("🔄 Yenilə", callback_data="Təqvim")
-                ]
-            ])
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            msg, reply_markup = render_cache.get("fixtures", page, result.get("version"), lambda: render_fixtures(result, page))
             
         except Exception as e:
             logger.error("Error parsing match data", exc_info=True)
@@ -248,35 +225,75 @@ async def back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     query = update.callback_query
     await query.answer()
     
-    keyboard = [
-        [
-            InlineKeyboardButton("📅 Təqvim", callback_data="Təqvim"),
-            InlineKeyboardButton("📊 Cədvəl", callback_data="table")
-        ],
-        [
-            InlineKeyboardButton("⚽ Son Nəticələr", callback_data="results"),
-            InlineKeyboardButton("👥 Oyunçular", callback_data="players")
-        ],
-        [
-            InlineKeyboardButton("📺 Canlı Yayım", callback_data="live"),
-            InlineKeyboardButton("ℹ️ Haqqında", callback_data="about")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    msg = "CHELSEA-nin ölkəmizdəki azərkeşləri üçün hazırlanmış bot\n\n"
-    msg += "Nə görmək istəyirsiniz?"
-    
     # Check if the current message has a photo (coming from photo message)
     if query.message.photo:
         # Delete the photo message and send a new text message
         await query.delete_message()
-        await query.message.reply_text(text=msg, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.message.reply_text(text=MAIN_MENU_TEXT, reply_markup=MAIN_MENU_MARKUP, parse_mode='Markdown')
     else:
         # Edit the existing text message
-        await query.edit_message_text(text=msg, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(text=MAIN_MENU_TEXT, reply_markup=MAIN_MENU_MARKUP, parse_mode='Markdown')
     return START_ROUTES
 
+def render_league_table(result, show_champions_league, callback_data):
+    """Message text and keyboard of a league table"""
+    table = table_from(result)
+    standings = table.standings
+    if not standings:
+        raise ValueError("No table data found")
+
+    if show_champions_league:
+        msg = "<b>ÇEMPİONLAR LİQASI CƏDVƏLİ</b>\n"
+    else:
+        msg = "<b>PREMYER LİQA CƏDVƏLİ</b>\n"
+    msg += "═" * 30 + "\n\n"
+
+    # Table header
+    msg += "<pre>\n"
+    msg += " #   Klub         O  Q  H  M  X\n"
+    msg += "───────────────────────────────────\n"
+
+    for team in standings:
+        # Truncate name if too long
+        name = team.club[:12]
+
+        # Highlight Chelsea
+        if team.featured:
+            line = f"►{team.position:2} {name:<12} {team.played:2} {team.won:2} {team.drawn:2} {team.lost:2} {team.points:2}◄"
+        else:
+            line = f" {team.position:2} {name:<12} {team.played:2} {team.won:2} {team.drawn:2} {team.lost:2} {team.points:2}"
+
+        msg += line + "\n"
+
+        # Add separation lines for qualification zones
+        if team.cut_line:
+            msg += "───────────────────────────────────\n"
+
+    msg += "</pre>\n\n"
+
+    # Build keyboard with toggle button
+    keyboard = []
+
+    # Toggle button
+    if show_champions_league:
+        keyboard.append([
+            InlineKeyboardButton("Premyer Liqa Cədvəli", callback_data="table")
+        ])
+    else:
+        keyboard.append([
+            InlineKeyboardButton("Çempionlar Liqası Cədvəli", callback_data="table_cl")
+        ])
+
+    # Navigation buttons
+    keyboard.append([
+        InlineKeyboardButton("◀️ Geri", callback_data="back_main"),
+        InlineKeyboardButton("🔄 Yenilə", callback_data=callback_data)
+    ])
+
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    return msg, reply_markup
+
+
 async def league_table(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Show league table with toggle between Premier League and Champions League."""
     # Group access check temporarily disabled since ALLOWED_GROUPS is empty
@@ -290,90 +307,26 @@ async def league_table(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     # Callback data format: "table" (default to PL) or "table_cl" (Champions League)
     show_champions_league = "_cl" in query.data
     
-    # Select appropriate API URL
-    api_url = settings.CHAMPIONS_LEAGUE_TABLE_URL if show_champions_league else settings.LEAGUE_TABLE_API_URL
+    # Select appropriate API URL and cache key
+    if show_champions_league:
+        api_url = settings.CHAMPIONS_LEAGUE_TABLE_URL
+        cache_key = "league_table_cl"
+    else:
+        api_url = settings.LEAGUE_TABLE_API_URL
+        cache_key = "league_table_pl"
+
+    # Fetch data with intelligent caching
+    result = await fetch_with_cache(url=api_url, cache_key=cache_key, max_age_hours=settings.LEAGUE_TABLE_CACHE_HOURS, grace_hours=settings.LEAGUE_TABLE_CACHE_GRACE_HOURS)
 
     try:
-        # Fetch data directly from API without caching
-        async with aiohttp.ClientSession() as session:
-            async with session.get(api_url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # Get the Premier League table
-                    items = data.get('items', [])
-                    if not items:
-                        raise ValueError("No table data found")
-                    
-                    standings = items[0]['standings']['tables'][0]['rows']
-                    competition_name = items[0]['competitionDetails']['title']
-                    if show_champions_league:
-                        msg = "<b>ÇEMPİONLAR LİQASI CƏDVƏLİ</b>\n"
-                    else:
-                        msg = "<b>PREMYER LİQA CƏDVƏLİ</b>\n"
-                    msg += "═" * 30 + "\n\n"
-                    
-                    # Table header
-                    msg += "<pre>\n"
-                    msg += " #   Klub         O  Q  H  M  X\n"
-                    msg += "───────────────────────────────────\n"
-                    
-                    for team in standings:
-                        pos = team['position']
-                        name = team['clubShortName']
-                        played = team['played']
-                        won = team['won']
-                        drawn = team['drawn'] 
-                        lost = team['lost']
-                        gf = team['goalsFor']
-                        ga = team['goalsAgainst']
-                        gd = team['goalDifference']
-                        points = team['points']
-                        is_chelsea = team['featuredTeam']
-                        
-                        # Truncate name if too long
-                        if len(name) > 12:
-                            name = name[:12]
-                        
-                        # Highlight Chelsea
-                        if is_chelsea:
-                            line = f"►{pos:2} {name:<12} {played:2} {won:2} {drawn:2} {lost:2} {points:2}◄"
-                        else:
-                            line = f" {pos:2} {name:<12} {played:2} {won:2} {drawn:2} {lost:2} {points:2}"
-                        
-                        msg += line + "\n"
-                        
-                        # Add separation lines for qualification zones
-                        if team.get('cutLine'):
-                            msg += "───────────────────────────────────\n"
-                    
-                    msg += "</pre>\n\n"
-                    
-                    # Build keyboard with toggle button
-                    keyboard = []
-                    
-                    # Toggle button
-                    if show_champions_league:
-                        keyboard.append([
-                            InlineKeyboardButton("Premyer Liqa Cədvəli", callback_data="table")
-                        ])
-                    else:
-                        keyboard.append([
-                            InlineKeyboardButton("Çempionlar Liqası Cədvəli", callback_data="table_cl")
-                        ])
-                    
-                    # Navigation buttons
-                    keyboard.append([
-                        InlineKeyboardButton("◀️ Geri", callback_data="back_main"),
-                        InlineKeyboardButton("🔄 Yenilə", callback_data=query.data)
-                    ])
-                    
-                    reply_markup = InlineKeyboardMarkup(keyboard)
-                    
-                else:
-                    # API request failed
-                    raise Exception(f"API request failed with status {response.status}")
-                    
+        if not result["success"]:
+            raise Exception(f"Table data unavailable: {result.get('error')}")
+
+        msg, reply_markup = render_cache.get(
+            cache_key, query.data, result.get("version"),
+            lambda: render_league_table(result, show_champions_league, query.data)
+        )
+                
     except Exception as e:
         logger.error("Error fetching table data", exc_info=True)
         msg = "❌ **Turnir Cədvəli Əlçatan Deyil**\n\n"
@@ -391,6 +344,67 @@ async def league_table(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     return START_ROUTES
 
 
+def render_results(result, page):
+    """Message text and keyboard of a recent results page"""
+    # Latest result first, then the rest without duplicates, indexed once per cache version
+    index = result_index_from(result)
+
+    # Pagination settings
+    matches_per_page = 5
+    total_pages = index.total_pages(matches_per_page)
+
+    # Get matches for current page
+    page_matches, start_idx = index.page(page, matches_per_page)
+
+    msg = "<b>SON NƏTİCƏLƏR</b>\n"
+    msg += "═" * 25 + "\n\n"
+    msg += f"📋 Səhifə {page}/{total_pages}\n\n"
+
+    # Convert to Azerbaijan timezone (+4)
+    kickoffs = convert_kickoffs_to_azerbaijan_time(page_matches)
+
+    for i, (match, (az_date, az_time)) in enumerate(zip(page_matches, kickoffs), start_idx + 1):
+
+        # Determine result icon from Chelsea's point of view
+        if match.chelsea_goals > match.opponent_goals:
+            result_icon = "🟢"  # Win
+        elif match.chelsea_goals == match.opponent_goals:
+            result_icon = "🟡"  # Draw
+        else:
+            result_icon = "🔴"  # Loss
+
+        home_icon = "🏠" if match.is_home else "✈️"
+
+        msg += f"{result_icon} <b>Oyun {i}</b>\n"
+        msg += f"⚽ {match.home} {match.home_score} - {match.away_score} {match.away}\n"
+        msg += f"{home_icon} {match.venue}\n"
+        msg += f"🏆 {match.competition}\n"
+        msg += f"📅 {az_date} - ⏰ {az_time}\n"
+        msg += "─" * 20 + "\n\n"
+
+    # Create pagination buttons
+    keyboard = []
+
+    # Navigation row
+    nav_row = []
+    if page > 1:
+        nav_row.append(InlineKeyboardButton("⬅️ Əvvəlki", callback_data=f"results_page_{page-1}"))
+    if page < total_pages:
+        nav_row.append(InlineKeyboardButton("Növbəti ➡️", callback_data=f"results_page_{page+1}"))
+    if nav_row:
+        keyboard.append(nav_row)
+
+    # Action buttons
+    keyboard.extend([
+        [
+            InlineKeyboardButton("◀️ Geri", callback_data="back_main"),
+            InlineKeyboardButton("🔄 Yenilə", callback_data="results")
+        ]
+    ])
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    return msg, reply_markup
+
+
 async def recent_results(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Show recent match results with pagination."""
     # Check if bot should respond in this chat
@@ -406,102 +420,11 @@ async def recent_results(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         page = int(query.data.split('_page_')[1])
     
     # Fetch data with intelligent caching
-    result = await fetch_with_cache(url=settings.RESULTS_API_URL, cache_key="recent_results", max_age_hours=settings.RESULTS_CACHE_HOURS)
+    result = await fetch_with_cache(url=settings.RESULTS_API_URL, cache_key="recent_results", max_age_hours=settings.RESULTS_CACHE_HOURS, grace_hours=settings.RESULTS_CACHE_GRACE_HOURS)
 
     if result["success"]:
         try:
-            data = result["data"]
-
-            # Get all matches from all months
-            all_matches = []
-            
-            # First, add the latest match if it exists
-            if 'latestResult' in data and 'fixture' in data['latestResult']:
-                latest_match = data['latestResult']['fixture']
-                all_matches.append(latest_match)
-            
-            # Then add matches from items (but skip duplicates)
-            for month_group in data['items']:
-                for match in month_group['items']:
-                    # Check if this match is already in the list (avoid duplicating latest match)
-                    if not any(existing_match['id'] == match['id'] for existing_match in all_matches):
-                        all_matches.append(match)
-            
-            # Pagination settings
-            matches_per_page = 5
-            total_matches = len(all_matches)
-            total_pages = (total_matches + matches_per_page - 1) // matches_per_page
-            
-            # Get matches for current page
-            start_idx = (page - 1) * matches_per_page
-            end_idx = start_idx + matches_per_page
-            page_matches = all_matches[start_idx:end_idx]
-            
-            msg = "<b>SON NƏTİCƏLƏR</b>\n"
-            msg += "═" * 25 + "\n\n"
-            msg += f"📋 Səhifə {page}/{total_pages}\n\n"
-            
-            for i, match in enumerate(page_matches, start_idx + 1):
-                m = match['matchUp']
-                home = m['home']['clubShortName']
-                away = m['away']['clubShortName']
-                home_score = m['home']['score']
-                away_score = m['away']['score']
-                date = match['kickoffDate']
-                time = match['kickoffTime']
-                venue = match['venue']
-                comp = match['competition']
-                
-                # Convert to Azerbaijan timezone (+4)
-                az_date, az_time = convert_to_azerbaijan_time(date, time)
-                
-                # Determine result icon
-                if m['isHomeFixture']:
-                    # Chelsea home
-                    if home_score > away_score:
-                        result_icon = "🟢"  # Win
-                    elif home_score == away_score:
-                        result_icon = "🟡"  # Draw
-                    else:
-                        result_icon = "🔴"  # Loss
-                else:
-                    # Chelsea away
-                    if away_score > home_score:
-                        result_icon = "🟢"  # Win
-                    elif away_score == home_score:
-                        result_icon = "🟡"  # Draw
-                    else:
-                        result_icon = "🔴"  # Loss
-                
-                home_icon = "🏠" if m['isHomeFixture'] else "✈️"
-                
-                msg += f"{result_icon} <b>Oyun {i}</b>\n"
-                msg += f"⚽ {home} {home_score} - {away_score} {away}\n"
-                msg += f"{home_icon} {venue}\n"
-                msg += f"🏆 {comp}\n"
-                msg += f"📅 {az_date} - ⏰ {az_time}\n"
-                msg += "─" * 20 + "\n\n"
-            
-            # Create pagination buttons
-            keyboard = []
-            
-            # Navigation row
-            nav_row = []
-            if page > 1:
-                nav_row.append(InlineKeyboardButton("⬅️ Əvvəlki", callback_data=f"results_page_{page-1}"))
-            if page < total_pages:
-                nav_row.append(InlineKeyboardButton("Növbəti ➡️", callback_data=f"results_page_{page+1}"))
-            if nav_row:
-                keyboard.append(nav_row)
-            
-            # Action buttons
-            keyboard.extend([
-                [
-                    InlineKeyboardButton("◀️ Geri", callback_data="back_main"),
-                    InlineKeyboardButton("🔄 Yenilə", callback_data="results")
-                ]
-            ])
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            msg, reply_markup = render_cache.get("recent_results", page, result.get("version"), lambda: render_results(result, page))
             
         except Exception as e:
             logger.error("Error parsing results data", exc_info=True)
@@ -542,61 +465,7 @@ async def players(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         page = int(query.data.split('_page_')[1])
     
     try:
-        # Create display list for buttons
-        players = [f"{p['number']} {p['full_name']}" if p['number'] else p['full_name'] for p in settings.PLAYERS]
-        
-        # Pagination
-        players_per_page = 10
-        total_players = len(players)
-        total_pages = (total_players + players_per_page - 1) // players_per_page
-        
-        start_idx = (page - 1) * players_per_page
-        end_idx = start_idx + players_per_page
-        page_players = players[start_idx:end_idx]
-        
-        msg = "👥 <b>CHELSEA OYUNÇULARI</b> 👥\n"
-        msg += "═" * 25 + "\n\n"
-        msg += f"📋 Səhifə {page}/{total_pages}\n\n"
-        
-        # Create player buttons
-        keyboard = []
-        for i in range(0, len(page_players), 2):  # 2 players per row
-            row = []
-            for j in range(2):
-                if i + j < len(page_players):
-                    player_name = page_players[i + j]
-                    # Extract just the name part (remove number if present)
-                    if player_name.split()[0].isdigit():
-                        # Has number, extract name part
-                        name_only = ' '.join(player_name.split()[1:])
-                    else:
-                        name_only = player_name
-                    
-                    # Find player by name
-                    player_data = next((player for player in settings.PLAYERS if player['full_name'] == name_only), None)
-                    callback_data = player_data['id']  
-                    
-                    row.append(InlineKeyboardButton(player_name, callback_data=callback_data))
-            keyboard.append(row)
-        
-        # Navigation buttons
-        nav_row = []
-        if page > 1:
-            nav_row.append(InlineKeyboardButton("⬅️ Əvvəlki", callback_data=f"players_page_{page-1}"))
-        if page < total_pages:
-            nav_row.append(InlineKeyboardButton("Növbəti ➡️", callback_data=f"players_page_{page+1}"))
-        if nav_row:
-            keyboard.append(nav_row)
-        
-        # Action buttons
-        keyboard.extend([
-            [
-                InlineKeyboardButton("◀️ Geri", callback_data="back_main"),
-                InlineKeyboardButton("🔄 Yenilə", callback_data="players")
-            ]
-        ])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        msg, reply_markup = player_list(page)
                     
     except Exception as e:
         logger.error("Error loading players data", exc_info=True)
@@ -649,15 +518,13 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
         return await recent_results(update, context)
     
     # Find player by ID to validate this is actually a player callback
-    player_data = next((player for player in settings.PLAYERS if player['id'] == player_id), None)
+    player = player_registry.get(player_id)
     
-    if not player_data:
+    if not player:
         # This callback data is not a valid player ID, ignore it
         return START_ROUTES
     
-    player_name = player_data['full_name']
-    player_number = player_data['number']
-    display_name = f"#{player_number} {player_name}" if player_number else player_name
+    display_name = player.display_name
     
     # If no competition selected, show competition selector first
     if not competition_id:
@@ -692,25 +559,23 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
             result = await fetch_with_cache(
                 url=stats_url, 
                 cache_key=cache_key, 
-                max_age_hours=settings.PLAYER_STATS_CACHE_HOURS
+                max_age_hours=settings.PLAYER_STATS_CACHE_HOURS,
+                grace_hours=settings.PLAYER_STATS_CACHE_GRACE_HOURS
             )
             
             if result["success"]:
-                stats_data = result["data"]
+                stats_data = player_stats_from(result)
                 
                 # Get available competitions from API response
                 available_competitions = []
-                if 'competitions' in stats_data:
-                    for comp in stats_data['competitions']:
-                        comp_id = comp.get('value')
-                        # Only include competitions we have translations for
-                        if comp_id in settings.COMPETITIONS_AZ:
-                            comp_name = settings.COMPETITIONS_AZ.get(comp_id)
-                            available_competitions.append({
-                                'id': comp_id,
-                                'name': comp_name,
-                                'selected': comp.get('selectedValue', False)
-                            })
+                for comp in stats_data.competitions:
+                    # Only include competitions we have translations for
+                    if comp.id in settings.COMPETITIONS_AZ:
+                        available_competitions.append({
+                            'id': comp.id,
+                            'name': settings.COMPETITIONS_AZ.get(comp.id),
+                            'selected': comp.selected
+                        })
                 
                 # Build competition selector message
                 msg = f"👤 <b>{display_name}</b>\n\n"
@@ -841,34 +706,24 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
         result = await fetch_with_cache(
             url=stats_url, 
             cache_key=cache_key, 
-            max_age_hours=settings.PLAYER_STATS_CACHE_HOURS
+            max_age_hours=settings.PLAYER_STATS_CACHE_HOURS,
+            grace_hours=settings.PLAYER_STATS_CACHE_GRACE_HOURS
         )
         photo_url = None
 
         if result["success"]:
-            stats_data = result["data"]
+            stats_data = player_stats_from(result)
             
             # Get available competitions from API response
             available_competitions = []
-            if 'competitions' in stats_data:
-                for comp in stats_data['competitions']:
-                    comp_id = comp.get('value')
-                    comp_name = settings.COMPETITIONS_AZ.get(comp_id, comp.get('displayText', 'Bilinmir'))
-                    available_competitions.append({
-                        'id': comp_id,
-                        'name': comp_name,
-                        'selected': comp.get('selectedValue', False)
-                    })
+            for comp in stats_data.competitions:
+                available_competitions.append({
+                    'id': comp.id,
+                    'name': settings.COMPETITIONS_AZ.get(comp.id, comp.name or 'Bilinmir'),
+                    'selected': comp.selected
+                })
             
-            # Try to get photo from different sections in the API response
-            for section in ['goalKeeping', 'goals', 'passSuccess']:
-                if (section in stats_data and 
-                    'playerAvatar' in stats_data[section] and
-                    'image' in stats_data[section]['playerAvatar'] and
-                    'file' in stats_data[section]['playerAvatar']['image'] and
-                    'url' in stats_data[section]['playerAvatar']['image']['file']):
-                    photo_url = stats_data[section]['playerAvatar']['image']['file']['url']
-                    break
+            photo_url = stats_data.photo_url
             
             # Build message with statistics
             msg = f"👤 <b>{display_name}</b>\n\n"
@@ -880,12 +735,9 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
                     msg += f"🏆 <b>{selected_comp['name']}</b>\n\n"
             
             # Appearances section
-            if 'appearances' in stats_data and 'stats' in stats_data['appearances']:
+            if stats_data.appearances is not None:
                 msg += "📊 <b>Oyunlar</b>\n"
-                appearances = stats_data['appearances']['stats']
-                for stat in appearances:
-                    title = stat.get('title', '')
-                    value = stat.get('value', '0')
+                for title, value in stats_data.appearances:
                     if 'Appearances' in title:
                         msg += f"• Oyun sayı: {value} oyun\n"
                     elif 'Minutes' in title:
@@ -895,12 +747,9 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
                 msg += "\n"
             
             # Goals section (if player has goals)
-            if 'goals' in stats_data and 'stats' in stats_data['goals']:
+            if stats_data.goals is not None:
                 msg += "⚽ <b>Qollar</b>\n"
-                goals = stats_data['goals']['stats']
-                for stat in goals:
-                    title = stat.get('title', '')
-                    value = stat.get('value', '0')
+                for title, value in stats_data.goals:
                     if 'Total Goals' in title:
                         msg += f"• Ümumi qol sayı: {value}\n"
                     elif 'Goals Per Match' in title:
@@ -908,33 +757,25 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
                 msg += "\n"
             
             # Scored With section (how goals were scored)
-            if 'scoredWith' in stats_data:
-                scored_with = stats_data['scoredWith']
-                has_goals = any(
-                    scored_with.get(key, {}).get('value', '0') != '0' 
-                    for key in ['head', 'leftFoot', 'rightFoot', 'penalties', 'freeKicks']
-                )
-                if has_goals:
-                    msg += "🎯 <b>Qol vurub:</b>\n"
-                    if scored_with.get('head', {}).get('value', '0') != '0':
-                        msg += f"• Başla: {scored_with['head']['value']}\n"
-                    if scored_with.get('leftFoot', {}).get('value', '0') != '0':
-                        msg += f"• Sol ayaqla: {scored_with['leftFoot']['value']}\n"
-                    if scored_with.get('rightFoot', {}).get('value', '0') != '0':
-                        msg += f"• Sağ ayaqla: {scored_with['rightFoot']['value']}\n"
-                    if scored_with.get('penalties', {}).get('value', '0') != '0':
-                        msg += f"• Penaltı: {scored_with['penalties']['value']}\n"
-                    if scored_with.get('freeKicks', {}).get('value', '0') != '0':
-                        msg += f"• Cərimə zərbəsi: {scored_with['freeKicks']['value']}\n"
-                    msg += "\n"
+            scored_with = stats_data.scored_with
+            if any(value != '0' for value in scored_with.values()):
+                msg += "🎯 <b>Qol vurub:</b>\n"
+                if scored_with['head'] != '0':
+                    msg += f"• Başla: {scored_with['head']}\n"
+                if scored_with['left_foot'] != '0':
+                    msg += f"• Sol ayaqla: {scored_with['left_foot']}\n"
+                if scored_with['right_foot'] != '0':
+                    msg += f"• Sağ ayaqla: {scored_with['right_foot']}\n"
+                if scored_with['penalties'] != '0':
+                    msg += f"• Penaltı: {scored_with['penalties']}\n"
+                if scored_with['free_kicks'] != '0':
+                    msg += f"• Cərimə zərbəsi: {scored_with['free_kicks']}\n"
+                msg += "\n"
             
             # Goalkeeping section (if goalkeeper)
-            if 'goalKeeping' in stats_data and 'stats' in stats_data['goalKeeping']:
+            if stats_data.goal_keeping is not None:
                 msg += "🥅 <b>Qapıçı Statistikası</b>\n"
-                gk_stats = stats_data['goalKeeping']['stats']
-                for stat in gk_stats:
-                    title = stat.get('title', '')
-                    value = stat.get('value', '0')
+                for title, value in stats_data.goal_keeping:
                     if 'Total Saves' in title:
                         msg += f"• Xilasetmələr: {value}\n"
                     elif 'Clean Sheets' in title:
@@ -942,12 +783,9 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
                 msg += "\n"
             
             # Pass Success section
-            if 'passSuccess' in stats_data and 'stats' in stats_data['passSuccess']:
+            if stats_data.pass_success is not None:
                 msg += "🎯 <b>Ötürmə sayı</b>\n"
-                pass_stats = stats_data['passSuccess']['stats']
-                for stat in pass_stats:
-                    title = stat.get('title', '')
-                    value = stat.get('value', '0')
+                for title, value in stats_data.pass_success:
                     if 'Total Passes' in title:
                         msg += f"• Ümumi ötürmə sayı: {value}\n"
                     elif 'Key Passes' in title:
@@ -956,43 +794,38 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
                         msg += f"• Asist sayı: {value}\n"
 
                 # Pass success rate
-                if 'playerRankingPercent' in stats_data['passSuccess']:
-                    success_rate = stats_data['passSuccess']['playerRankingPercent']
+                if stats_data.pass_percent is not None:
+                    success_rate = stats_data.pass_percent
                     msg += f"• Dəqiqlik: {success_rate}%\n"
                 msg += "\n"
             
             # Fouls section
-            if 'fouls' in stats_data:
-                fouls = stats_data['fouls']
-                if any(fouls.values()):
-                    msg += "🟨 <b>Qayda pozuntuları</b>\n"
-                    if 'yellowCards' in fouls and fouls['yellowCards'].get('value', '0') != '0':
-                        msg += f"• Sarı kart sayı: {fouls['yellowCards']['value']}\n"
-                    if 'redCards' in fouls and fouls['redCards'].get('value', '0') != '0':
-                        msg += f"• Qırmızı kart sayı: {fouls['redCards']['value']}\n"
-                    if 'foulsDrawn' in fouls and fouls['foulsDrawn'].get('value', '0') != '0':
-                        msg += f"• Məruz qaldığı pozuntular: {fouls['foulsDrawn']['value']}\n"
-                    msg += "\n"
+            if stats_data.fouls is not None:
+                fouls = stats_data.fouls
+                msg += "🟨 <b>Qayda pozuntuları</b>\n"
+                if fouls['yellow_cards'] != '0':
+                    msg += f"• Sarı kart sayı: {fouls['yellow_cards']}\n"
+                if fouls['red_cards'] != '0':
+                    msg += f"• Qırmızı kart sayı: {fouls['red_cards']}\n"
+                if fouls['fouls_drawn'] != '0':
+                    msg += f"• Məruz qaldığı pozuntular: {fouls['fouls_drawn']}\n"
+                msg += "\n"
             
             # Shots section
-            if 'shots' in stats_data:
-                shots = stats_data['shots']
-                if (shots.get('playerShotsOnTarget', '0') != '0' or 
-                    shots.get('playerShotsOffTarget', '0') != '0'):
+            if stats_data.shots is not None:
+                shots = stats_data.shots
+                if shots['on_target'] != '0' or shots['off_target'] != '0':
                     msg += "🎯 <b>Zərbələr</b>\n"
-                    if shots.get('playerShotsOnTarget', '0') != '0':
-                        msg += f"• Dəqiq zərbə sayı: {shots['playerShotsOnTarget']}\n"
-                    if shots.get('playerShotsOffTarget', '0') != '0':
-                        msg += f"• Dəqiq olmayan zərbə sayı: {shots['playerShotsOffTarget']}\n"
+                    if shots['on_target'] != '0':
+                        msg += f"• Dəqiq zərbə sayı: {shots['on_target']}\n"
+                    if shots['off_target'] != '0':
+                        msg += f"• Dəqiq olmayan zərbə sayı: {shots['off_target']}\n"
                     msg += "\n"
             
             # Touches section
-            if 'touches' in stats_data and 'stats' in stats_data['touches']:
+            if stats_data.touches is not None:
                 msg += "⚽ <b>Oyun Fəaliyyəti</b>\n"
-                touches = stats_data['touches']['stats']
-                for stat in touches:
-                    title = stat.get('title', '')
-                    value = stat.get('value', '0')
+                for title, value in stats_data.touches:
                     if 'Total Touches' in title:
                         msg += f"• Topa toxunmalar: {value}\n"
                     elif 'Tackles Won' in title and '/' in value:
@@ -1013,7 +846,7 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
 
 
             # If no significant stats found, show basic info
-            if not any(section in stats_data for section in ['appearances', 'goals', 'goalKeeping', 'passSuccess']):
+            if not any(getattr(stats_data, section) is not None for section in ['appearances', 'goals', 'goal_keeping', 'pass_success']):
                 msg += "📊 Bu oyunçu üçün ətraflı statistika hələ mövcud deyil.\n\n"
             
         else:
@@ -1041,43 +874,26 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     # Try to send photo with caption if photo is available locally
     import os
     
-    # Check for local player photo first (much faster)
-    photo_path = None
-    static_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'players')
-    
-    # Try different file extensions and naming conventions
-    possible_filenames = [
-        f"{player_id}.jpg",
-        f"{player_id}.jpeg", 
-        f"{player_id}.png",
-        f"{player_id}.webp",
-        f"{player_name.lower().replace(' ', '-')}.jpg",
-        f"{player_name.lower().replace(' ', '-')}.jpeg",
-        f"{player_name.lower().replace(' ', '-')}.png",
-        f"{player_name.lower().replace(' ', '-')}.webp"
-    ]
-    
-    for filename in possible_filenames:
-        full_path = os.path.join(static_folder, filename)
-        if os.path.exists(full_path):
-            photo_path = full_path
-            break
+    # Check for local player photo first (much faster), from the manifest built at startup
+    photo = photo_manifest.get(player_id)
     
     # If local photo exists, use it (much faster)
-    if photo_path:
+    if photo:
         try:
-            with open(photo_path, 'rb') as photo_file:
-                photo_data = photo_file.read()
-                
             await query.delete_message()  # Delete the loading message
             try:
-                await context.bot.send_photo(
-                    chat_id=query.message.chat.id,
-                    photo=photo_data,
+                # Uploaded once, then sent by Telegram file_id
+                await photo_file_ids.send(
+                    context.bot,
+                    query.message.chat.id,
+                    player_id,
+                    photo,
                     caption=msg,
                     reply_markup=reply_markup,
                     parse_mode='HTML'
                 )
+                if photo_file_ids.dirty:
+                    await api_cache.run_io(photo_file_ids.save)
             except Exception as local_photo_send_error:
                 logger.error(f"Error sending local photo to group: {local_photo_send_error}")
                 # Fallback to text message
@@ -1102,49 +918,51 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
                 photo_url = photo_url.replace('png', 'webp')
             
             # Try to download and send the image
-            async with aiohttp.ClientSession() as session:
-                async with session.get(photo_url) as img_response:
-                    if img_response.status == 200 and img_response.content_type.startswith('image/'):
-                        image_data = await img_response.read()
-                        
-                        # Check if image is too large for Telegram (10MB limit)
-                        max_size = 10 * 1024 * 1024  # 10MB in bytes
-                        if len(image_data) > max_size:
-                            logger.warning(f"Image too large: {len(image_data)} bytes (max {max_size})")
-                            raise Exception(f"Image too large: {len(image_data)} bytes")
-                        
-                        # Optionally save the downloaded image for future use
-                        try:
-                            save_path = os.path.join(static_folder, f"{player_id}.jpg")
-                            with open(save_path, 'wb') as f:
-                                f.write(image_data)
-                            logger.info(f"Saved player photo to {save_path}")
-                        except Exception as save_error:
-                            logger.warning(f"Could not save photo: {save_error}")
-                        
-                        await query.delete_message()  # Delete the loading message
-                        try:
-                            await context.bot.send_photo(
-                                chat_id=query.message.chat.id,
-                                photo=image_data,
-                                caption=msg,
-                                reply_markup=reply_markup,
-                                parse_mode='HTML'
-                            )
-                        except Exception as photo_send_error:
-                            logger.error(f"Error sending photo to group: {photo_send_error}")
-                            # Fallback to text message
-                            await context.bot.send_message(
-                                chat_id=query.message.chat.id,
-                                text=msg,
-                                reply_markup=reply_markup,
-                                parse_mode='HTML'
-                            )
-                        return START_ROUTES
-                    else:
-                        # Image not accessible, fall back to text
-                        raise Exception(f"Image not accessible: {img_response.status}")
-                        
+            img_response = await upstream_client.get(photo_url)
+            if img_response.status == 200 and img_response.content_type.startswith('image/'):
+                image_data = img_response.body
+                
+                # Check if image is too large for Telegram (10MB limit)
+                max_size = 10 * 1024 * 1024  # 10MB in bytes
+                if len(image_data) > max_size:
+                    logger.warning(f"Image too large: {len(image_data)} bytes (max {max_size})")
+                    raise Exception(f"Image too large: {len(image_data)} bytes")
+                
+                # Optionally save the downloaded image for future use
+                saved_photo = None
+                try:
+                    save_path = os.path.join(PLAYER_PHOTO_DIR, f"{player_id}.jpg")
+                    saved_photo = await api_cache.run_io(photo_manifest.save, player_id, save_path, image_data)
+                    logger.info(f"Saved player photo to {save_path}")
+                except Exception as save_error:
+                    logger.warning(f"Could not save photo: {save_error}")
+                
+                await query.delete_message()  # Delete the loading message
+                try:
+                    message = await context.bot.send_photo(
+                        chat_id=query.message.chat.id,
+                        photo=image_data,
+                        caption=msg,
+                        reply_markup=reply_markup,
+                        parse_mode='HTML'
+                    )
+                    if saved_photo is not None:
+                        photo_file_ids.remember(player_id, saved_photo.sha256, message)
+                        await api_cache.run_io(photo_file_ids.save)
+                except Exception as photo_send_error:
+                    logger.error(f"Error sending photo to group: {photo_send_error}")
+                    # Fallback to text message
+                    await context.bot.send_message(
+                        chat_id=query.message.chat.id,
+                        text=msg,
+                        reply_markup=reply_markup,
+                        parse_mode='HTML'
+                    )
+                return START_ROUTES
+            else:
+                # Image not accessible, fall back to text
+                raise Exception(f"Image not accessible: {img_response.status}")
+                    
         except Exception as photo_error:
             logger.error(f"Error sending photo: {photo_error}")
             # If photo failed and message was deleted, handle properly for groups
@@ -1264,14 +1082,7 @@ async def coming_soon(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     query = update.callback_query
     await query.answer()
     
-    msg = "🚧 **Tezliklə** 🚧\n\n"
-    msg += "Bu xüsusiyyət hazırda inkişaf mərhələsindədir.\n"
-    msg += "Tezliklə əlavə olunacaq! 🔄"
-    
-    keyboard = [[InlineKeyboardButton("◀️ Geri", callback_data="back_main")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(text=msg, reply_markup=reply_markup, parse_mode='Markdown')
+    await query.edit_message_text(text=COMING_SOON_TEXT, reply_markup=COMING_SOON_MARKUP, parse_mode='Markdown')
     return START_ROUTES
 
 
@@ -1323,9 +1134,47 @@ async def create_channel_post(post_type: str) -> dict:
     return posts.get(post_type, posts["daily_fixtures"])
 
 
+async def post_init(application: Application) -> None:
+    """Start shared resources once the application is initialised"""
+    await http_session.start(application)
+    await photo_manifest.arefresh()
+    await api_cache.run_io(photo_file_ids.load)
+
+    if application.job_queue is None:
+        logger.warning("JobQueue is not available, background cache jobs are disabled")
+        return
+    application.job_queue.run_repeating(
+        cache_janitor,
+        interval=settings.CACHE_JANITOR_INTERVAL_MINUTES * 60,
+        first=60,
+        name="cache_janitor"
+    )
+    if settings.PREFETCH_ENABLED:
+        await prefetcher.start(application.job_queue)
+    if settings.PHOTO_MANIFEST_RECHECK_SECONDS > 0:
+        application.job_queue.run_repeating(
+            photo_manifest.arefresh,
+            interval=settings.PHOTO_MANIFEST_RECHECK_SECONDS,
+            first=settings.PHOTO_MANIFEST_RECHECK_SECONDS,
+            name="photo_manifest"
+        )
+
+
+async def post_shutdown(application: Application) -> None:
+    """Release shared resources when the application shuts down"""
+    await http_session.close(application)
+    api_cache.shutdown()
+
+
 def main() -> None:
     """Run the bot with webhook for Render deployment."""
-    application = Application.builder().token(settings.BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(settings.BOT_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     # Command handlers for direct access to services
     async def cmd_calendar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -1467,28 +1316,9 @@ def main() -> None:
         if not await check_group_access(update, context):
             return
         
-        help_text = (
-            "🤖 <b>CFC Azerbaijan Bot</b>\n\n"
-            "📋 <b>Özəlliklər</b>\n\n"
-            "🏠 /start - Əsas menyu\n"
-            "❓ /komek - Özəlliklərin siyahısı\n\n"
-            "📅 /teqvim - Oyun təqvimi\n"
-            "📊 /cedvel - Turnir cədvəli\n"
-            "⚽ /hesablar - Son nəticələr\n"
-            "👥 /komanda - Oyunçular\n"
-            "📺 /canli - Canlı yayım\n"
-            "ℹ️ /haqqinda - Haqqında\n\n"
-            "💡 <b>Məsləhət:</b> Əmrləri yazmaq üçün / işarəsindən istifadə edin!"
-        )
-        
-        keyboard = [
-            [InlineKeyboardButton("🏠 Ana Menyu", callback_data="back_main")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await update.message.reply_text(
-            text=help_text,
-            reply_markup=reply_markup,
+            text=HELP_TEXT,
+            reply_markup=HELP_MARKUP,
             parse_mode='HTML'
         )
         return START_ROUTES
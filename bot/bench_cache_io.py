@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark event-loop lag while many cache reads run at once.
+
+The cached season player-stats entries are copied into a scratch cache
+as raw upstream payloads (unprojected, as they were cached when the async
+API was added). Each round then taps every key 3 times concurrently, with
+the memory tier cold, while a 1 ms ticker measures how late the loop wakes
+it up. Two runs are timed:
+
+  blocking  load_cache() called inside the coroutine, as handlers did
+            before the async cache API (disk I/O and json on the loop)
+  async     aload_cache(), which runs them in the cache I/O executor
+
+Usage: python bench_cache_io.py [rounds]
+"""
+import os
+import sys
+import glob
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import settings
+
+from service import APICache
+
+logging.disable(logging.CRITICAL)
+
+TAPS_PER_KEY = 3
+
+def seed_cache(cache_dir):
+    """Copy the cached season player stats into cache_dir in the current format; return their keys"""
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+    for path in glob.glob(os.path.join(source, "player_stats_*_season_*.json")):
+        shutil.copy(path, cache_dir)
+    cache = APICache(cache_dir)
+    keys = [os.path.basename(path)[:-len(".json")] for path in glob.glob(os.path.join(cache_dir, "*.json"))]
+    for cache_key in keys:
+        cache.save_cache(cache_key, cache.load_cache(cache_key)["data"])
+    cache.shutdown()
+    return keys
+
+async def ticker(lags, stop):
+    """Sleep 1 ms at a time and record how late each wake-up is"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+async def blocking_tap(cache, cache_key):
+    return cache.load_cache(cache_key)
+
+async def async_tap(cache, cache_key):
+    return await cache.aload_cache(cache_key)
+
+async def run(tap, cache_dir, keys, rounds):
+    lags = []
+    stop = asyncio.Event()
+    ticks = asyncio.create_task(ticker(lags, stop))
+    started = time.perf_counter()
+    for _ in range(rounds):
+        # A fresh APICache per round, so every tap goes to disk
+        cache = APICache(cache_dir, memory_recheck_seconds=0)
+        results = await asyncio.gather(*[tap(cache, cache_key) for cache_key in keys for _ in range(TAPS_PER_KEY)])
+        cache.shutdown()
+        assert all(result is not None for result in results)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticks
+    lags.sort()
+    return elapsed, lags
+
+def bench_cache_io(rounds=40):
+    cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+    try:
+        keys = seed_cache(cache_dir)
+        if not keys:
+            print("⚠️ No cached season player stats to read")
+            return
+        print(f"ℹ️ {rounds} rounds of {len(keys) * TAPS_PER_KEY} concurrent taps on {len(keys)} entries, "
+              f"{settings.CACHE_IO_WORKERS} cache I/O workers")
+        for name, tap in (("blocking", blocking_tap), ("async", async_tap)):
+            elapsed, lags = asyncio.run(run(tap, cache_dir, keys, rounds))
+            print(
+                f"  {name:8} wall {elapsed * 1000:6.0f} ms, loop lag p50 {statistics.median(lags) * 1000:5.2f} ms, "
+                f"p99 {lags[int(len(lags) * 0.99)] * 1000:5.2f} ms, max {lags[-1] * 1000:5.1f} ms, {len(lags)} ticks"
+            )
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    bench_cache_io(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark kickoff conversion to Azerbaijan time.
+
+Times the conversion over every kickoff in the cached fixtures and recent
+results, three ways: the pre-memoisation convert_to_azerbaijan_time (kept
+below as a reference copy), the current function with its memo cleared
+before each round, and the current function memoised.
+
+Usage: python bench_kickoff_times.py [rounds]
+"""
+import os
+import sys
+import time
+import logging
+from datetime import datetime
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import settings
+
+from utils import convert_to_azerbaijan_time, convert_kickoffs_to_azerbaijan_time
+from service import APICache
+from projections import ensure_projected
+from models import fixture_index_from, result_index_from
+
+logging.disable(logging.CRITICAL)
+
+def legacy_convert_to_azerbaijan_time(date_str, time_str):
+    """convert_to_azerbaijan_time as it was before memoisation, for comparison"""
+    try:
+        parts = date_str.split()
+        day_name = parts[0]
+        day = int(parts[1])
+        month = parts[2]
+        year = int(parts[3])
+        hour, minute = map(int, time_str.split(':'))
+        dt = datetime(year, list(settings.MONTHS.keys()).index(month) + 1, day, hour, minute)
+        london_tz = pytz.timezone('Europe/London')
+        azerbaijan_tz = pytz.timezone('Asia/Baku')
+        az_dt = london_tz.localize(dt).astimezone(azerbaijan_tz)
+        az_day_name = settings.WEEKDAYS.get(day_name, day_name)
+        az_month = settings.MONTHS.get(month, month)
+        return f"{az_day_name} {az_dt.day} {az_month} {az_dt.year}", f"{az_dt.hour:02d}:{az_dt.minute:02d}"
+    except Exception:
+        return date_str, time_str
+
+def cached_matches():
+    """Matches of the cached fixtures and recent results"""
+    cache = APICache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"), normalise=ensure_projected)
+    try:
+        matches = []
+        for cache_key, index_from in (("fixtures", fixture_index_from), ("recent_results", result_index_from)):
+            result = cache.load_cache(cache_key)
+            if result is not None:
+                matches.extend(index_from(result).matches)
+        return matches
+    finally:
+        cache.shutdown()
+
+def time_per_call(func, kickoffs, rounds, before_round=None):
+    """Average microseconds per kickoff"""
+    elapsed = 0.0
+    for _ in range(rounds):
+        if before_round is not None:
+            before_round()
+        started = time.perf_counter()
+        for date_str, time_str in kickoffs:
+            func(date_str, time_str)
+        elapsed += time.perf_counter() - started
+    return elapsed / (rounds * len(kickoffs)) * 1e6
+
+def bench_kickoff_times(rounds=200):
+    matches = cached_matches()
+    if not matches:
+        print("⚠️ No cached fixtures or results to convert")
+        return
+    kickoffs = [(match.kickoff_date, match.kickoff_time) for match in matches]
+
+    legacy = time_per_call(legacy_convert_to_azerbaijan_time, kickoffs, rounds)
+    cold = time_per_call(convert_to_azerbaijan_time, kickoffs, rounds, convert_to_azerbaijan_time.cache_clear)
+    warm = time_per_call(convert_to_azerbaijan_time, kickoffs, rounds)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        convert_kickoffs_to_azerbaijan_time(matches)
+    batch = (time.perf_counter() - started) / (rounds * len(matches)) * 1e6
+
+    changed = sum(legacy_convert_to_azerbaijan_time(*kickoff) != convert_to_azerbaijan_time(*kickoff) for kickoff in kickoffs)
+    print(f"ℹ️ {len(kickoffs)} cached kickoffs, {rounds} rounds")
+    print(f"  old function       {legacy:6.2f} us/call")
+    print(f"  new, cold (miss)   {cold:6.2f} us/call")
+    print(f"  new, memoised      {warm:6.2f} us/call")
+    print(f"  new, batch of page {batch:6.2f} us/match")
+    print(f"ℹ️ {changed} kickoffs render differently (Sep spelling, Baku weekday/month)")
+
+if __name__ == "__main__":
+    bench_kickoff_times(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark allocations of a menu round trip.
+
+Replays the screens of /start -> coming soon -> players -> back to menu
+two ways:
+
+  before  every keyboard built from new buttons on each call, as the
+          handlers did before screens.py
+  after   the prebuilt screens the handlers use now
+
+and reports keyboard objects built, peak traced memory (tracemalloc) and
+time per round trip.
+
+Usage: python bench_menu_screens.py [round trips]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from screens import (
+    MAIN_MENU_MARKUP, MAIN_MENU_TEXT, WELCOME_PROMPT, COMING_SOON_TEXT, COMING_SOON_MARKUP,
+    build_player_list, player_list
+)
+
+def rebuild(markup):
+    """A new keyboard with the same buttons, the way handlers used to build one"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(button.text, callback_data=button.callback_data) for button in row]
+        for row in markup.inline_keyboard
+    ])
+
+def round_trip_before(first_name="Ali"):
+    screens = [(f"**Salam, {first_name}!**\n\n" + WELCOME_PROMPT, rebuild(MAIN_MENU_MARKUP))]
+    screens.append((COMING_SOON_TEXT, rebuild(COMING_SOON_MARKUP)))
+    text, markup = build_player_list(1)
+    screens.append((text, rebuild(markup)))
+    screens.append((MAIN_MENU_TEXT, rebuild(MAIN_MENU_MARKUP)))
+    return screens
+
+def round_trip_after(first_name="Ali"):
+    return [
+        (f"**Salam, {first_name}!**\n\n" + WELCOME_PROMPT, MAIN_MENU_MARKUP),
+        (COMING_SOON_TEXT, COMING_SOON_MARKUP),
+        player_list(1),
+        (MAIN_MENU_TEXT, MAIN_MENU_MARKUP),
+    ]
+
+def count_keyboard_objects():
+    """Count InlineKeyboardButton/Markup constructions; returns the counter dict"""
+    counts = {"built": 0}
+    for cls in (InlineKeyboardButton, InlineKeyboardMarkup):
+        original = cls.__init__
+
+        def init(self, *args, _original=original, **kwargs):
+            counts["built"] += 1
+            _original(self, *args, **kwargs)
+        cls.__init__ = init
+    return counts
+
+def bench_menu_screens(round_trips=1000):
+    before, after = round_trip_before(), round_trip_after()
+    identical = all(
+        a[0] == b[0] and a[1].to_dict() == b[1].to_dict() for a, b in zip(before, after)
+    )
+    print(f"ℹ️ Screens identical before/after: {identical}")
+
+    timings = {}
+    for name, round_trip in (("before", round_trip_before), ("after", round_trip_after)):
+        for _ in range(50):
+            round_trip()
+        started = time.perf_counter()
+        for _ in range(round_trips):
+            round_trip()
+        timings[name] = (time.perf_counter() - started) / round_trips
+
+    counts = count_keyboard_objects()
+    for name, round_trip in (("before", round_trip_before), ("after", round_trip_after)):
+        counts["built"] = 0
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        round_trip()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"  {name:6} {counts['built']:3} buttons/markups built, {(peak - baseline) / 1024:5.1f} KiB peak, "
+            f"{timings[name] * 1e6:6.1f} us per round trip"
+        )
+
+if __name__ == "__main__":
+    bench_menu_screens(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
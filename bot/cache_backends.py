@@ -0,0 +1,449 @@
+import os
+import gzip
+import json
+import time
+import sqlite3
+import logging
+import threading
+import settings
+from datetime import datetime
+
+from file_lock import FileLock, lock_path_for, write_atomic
+
+
+logger = logging.getLogger(__name__)
+
+# On-disk cache format. Version 3 index files ("<key>.cache") hold a single
+# compact JSON header line (version, timestamp, validators, blob hash). The
+# payload lives in a content-addressed blob ("blobs/<sha256>.blob", compact
+# JSON, optionally gzipped), so identical responses under different keys are
+# stored once. Version 2 files (header line + inline payload) and legacy
+# "<key>.json" files are still readable.
+CACHE_FORMAT_VERSION = 3
+READABLE_CACHE_FORMAT_VERSIONS = (2, 3)
+GZIP_MAGIC = b"\x1f\x8b"
+BLOB_MIN_AGE_SECONDS = 60
+TEMP_FILE_MIN_AGE_SECONDS = 3600
+
+
+def compress_payload(payload):
+    """Gzip payload bytes when CACHE_COMPRESS is on"""
+    if settings.CACHE_COMPRESS:
+        return gzip.compress(payload, compresslevel=settings.CACHE_COMPRESS_LEVEL)
+    return payload
+
+def decompress_payload(payload):
+    """Undo compress_payload; plain payloads pass through"""
+    if payload[:2] == GZIP_MAGIC:
+        return gzip.decompress(payload)
+    return payload
+
+def encode_header(header):
+    """Serialise an entry header as one compact JSON line"""
+    return json.dumps(header, ensure_ascii=False, separators=(',', ':'))
+
+
+class CacheBackend:
+    """
+    Storage interface behind APICache.
+
+    Entries are a header dict (timestamp, etag, last_modified, blob) plus a
+    payload stored once per blob hash. Every write changes the entry's
+    version token, which APICache uses to notice writes by other processes.
+    """
+
+    def version(self, cache_key):
+        """Return the entry's current version token, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    def read(self, cache_key, blobs):
+        """
+        Return (version, cache_data) or (None, None).
+
+        blobs maps blob hashes to payloads already parsed in memory, so
+        they don't need to be read and decoded again. It is APICache's live
+        dict and other threads may drop hashes from it, so look a hash up
+        with a single get.
+        """
+        raise NotImplementedError
+
+    def write(self, cache_key, header, payload=None):
+        """Write an entry; payload=None keeps the blob named in the header. Returns the new version"""
+        raise NotImplementedError
+
+    def list_entries(self):
+        """List entries as dicts with key, size, mtime and blob"""
+        raise NotImplementedError
+
+    def remove_expired(self, cutoff):
+        """
+        Delete entries whose TTL ran out before cutoff (epoch seconds) and
+        return them as (key, size) pairs, or None if the backend can't tell
+        expiry (APICache then goes by the write time).
+        """
+        return None
+
+    def remove(self, cache_key):
+        """Delete an entry; returns True if it was removed"""
+        raise NotImplementedError
+
+    def blob_size(self, blob_hash):
+        """Stored size of a blob in bytes"""
+        raise NotImplementedError
+
+    def sweep(self, referenced_blobs):
+        """Delete blobs not in referenced_blobs plus any leftovers; returns a report dict"""
+        raise NotImplementedError
+
+
+class FileCacheBackend(CacheBackend):
+    """One index file per key and one blob file per payload under cache_dir"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.ensure_cache_dir()
+
+    def ensure_cache_dir(self):
+        """Create cache and blob directories if they don't exist"""
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    def get_cache_file_path(self, cache_key):
+        """Get the full path for a cache file"""
+        return os.path.join(self.cache_dir, f"{cache_key}.cache")
+
+    def get_legacy_cache_file_path(self, cache_key):
+        """Get the path of a pre-version-2 pretty-printed JSON cache file"""
+        return os.path.join(self.cache_dir, f"{cache_key}.json")
+
+    def get_blob_path(self, blob_hash):
+        """Get the full path for a payload blob"""
+        return os.path.join(self.blob_dir, f"{blob_hash}.blob")
+
+    def _stat_cache_file(self, cache_key):
+        """Return (path, mtime) of the current cache file for a key, or (None, None)"""
+        for path in (self.get_cache_file_path(cache_key), self.get_legacy_cache_file_path(cache_key)):
+            try:
+                return path, os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        return None, None
+
+    def _write_atomic(self, path, content):
+        """Write bytes via a temp file in the cache directory and rename it into place"""
+        write_atomic(path, content, tmp_dir=self.cache_dir)
+
+    def _read_raw(self, cache_file):
+        """
+        Return (header, inline payload bytes) of a version 2 or 3 file.
+
+        Version 3 files reference a blob instead, so their payload is None.
+        """
+        with open(cache_file, 'rb') as f:
+            content = decompress_payload(f.read())
+        header_line, _, payload = content.partition(b"\n")
+        header = json.loads(header_line)
+        if header.get("version") not in READABLE_CACHE_FORMAT_VERSIONS:
+            raise ValueError(f"Unsupported cache format version: {header.get('version')}")
+        header.pop("version")
+        if header.get("blob"):
+            payload = None
+        return header, payload
+
+    def _read_blob(self, blob_hash):
+        """Return the raw payload bytes of a blob"""
+        with open(self.get_blob_path(blob_hash), 'rb') as f:
+            return decompress_payload(f.read())
+
+    def version(self, cache_key):
+        return self._stat_cache_file(cache_key)[1]
+
+    def read(self, cache_key, blobs):
+        cache_file, version = self._stat_cache_file(cache_key)
+        if cache_file is None:
+            return None, None
+
+        if cache_file.endswith(".json"):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    return version, json.load(f)
+            except FileNotFoundError:
+                # Removed since the stat; fall back to the key's .cache file, if any
+                return self.read(cache_key, blobs)
+
+        header, payload = self._read_raw(cache_file)
+        blob_hash = header.get("blob")
+        data = blobs.get(blob_hash) if blob_hash else None
+        if data is not None:
+            header["data"] = data
+        elif blob_hash:
+            header["data"] = json.loads(self._read_blob(blob_hash))
+        else:
+            header["data"] = json.loads(payload)
+        return version, header
+
+    def write(self, cache_key, header, payload=None):
+        cache_file = self.get_cache_file_path(cache_key)
+        # Serialise writers of the same key across processes
+        with FileLock(lock_path_for(cache_file)):
+            if payload is not None:
+                blob_file = self.get_blob_path(header["blob"])
+                if os.path.exists(blob_file):
+                    # Bump mtime so the janitor doesn't sweep it while the index is written
+                    os.utime(blob_file)
+                else:
+                    self._write_atomic(blob_file, compress_payload(payload))
+
+            header = dict(header, version=CACHE_FORMAT_VERSION)
+            # A legacy .json for the key is left alone: it is shipped in the repo and the
+            # .cache file now shadows it
+            self._write_atomic(cache_file, encode_header(header).encode('utf-8') + b"\n")
+            return os.stat(cache_file).st_mtime_ns
+
+    def list_entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith("."):
+                continue
+            cache_key, ext = os.path.splitext(name)
+            if ext not in (".cache", ".json"):
+                continue
+            if ext == ".json" and os.path.exists(self.get_cache_file_path(cache_key)):
+                continue  # Shadowed by the key's .cache file
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+                blob_hash = self._read_raw(path)[0].get("blob") if ext == ".cache" else None
+            except Exception:
+                continue
+            entries.append({"key": cache_key, "size": st.st_size, "mtime": st.st_mtime, "blob": blob_hash})
+        return entries
+
+    def remove(self, cache_key):
+        removed = False
+        with FileLock(lock_path_for(self.get_cache_file_path(cache_key))):
+            for path in (self.get_cache_file_path(cache_key), self.get_legacy_cache_file_path(cache_key)):
+                try:
+                    os.remove(path)
+                    removed = True
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning(f"Could not remove cache file {path}: {e}")
+        return removed
+
+    def blob_size(self, blob_hash):
+        try:
+            return os.path.getsize(self.get_blob_path(blob_hash))
+        except OSError:
+            return 0
+
+    def sweep(self, referenced_blobs):
+        report = {"blobs": 0, "temp_files": 0, "bytes_reclaimed": 0}
+        now = time.time()
+
+        # Temp files left behind by a crash mid-write
+        for name in os.listdir(self.cache_dir):
+            if not (name.startswith(".") and name.endswith(".tmp")):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if now - os.path.getmtime(path) < TEMP_FILE_MIN_AGE_SECONDS:
+                    continue
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            report["temp_files"] += 1
+            report["bytes_reclaimed"] += size
+
+        # Blobs no index points at (skip fresh ones a writer may be about to reference)
+        for name in os.listdir(self.blob_dir):
+            blob_hash, ext = os.path.splitext(name)
+            if ext != ".blob" or blob_hash in referenced_blobs:
+                continue
+            path = os.path.join(self.blob_dir, name)
+            try:
+                if now - os.path.getmtime(path) < BLOB_MIN_AGE_SECONDS:
+                    continue
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            report["blobs"] += 1
+            report["bytes_reclaimed"] += size
+        return report
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Entries and blobs in one SQLite database in WAL mode, so several bot
+    processes on the same host can share a single warm cache.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            header TEXT NOT NULL,
+            blob TEXT,
+            version INTEGER NOT NULL DEFAULT 1,
+            updated_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries (expires_at);
+        CREATE INDEX IF NOT EXISTS idx_entries_blob ON entries (blob);
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            payload BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS version_seq (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO version_seq (id, value) SELECT 1, coalesce(max(version), 0) FROM entries;
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # sqlite3 connections can't be shared across threads, so keep one per thread
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=settings.CACHE_SQLITE_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def version(self, cache_key):
+        row = self._connect().execute("SELECT version FROM entries WHERE key = ?", (cache_key,)).fetchone()
+        return row[0] if row else None
+
+    def read(self, cache_key, blobs):
+        conn = self._connect()
+        row = conn.execute("SELECT version, header, blob FROM entries WHERE key = ?", (cache_key,)).fetchone()
+        if row is None:
+            return None, None
+
+        version, header, blob_hash = row
+        header = json.loads(header)
+        data = blobs.get(blob_hash)
+        if data is not None:
+            header["data"] = data
+        else:
+            blob_row = conn.execute("SELECT payload FROM blobs WHERE hash = ?", (blob_hash,)).fetchone()
+            if blob_row is None:
+                return None, None
+            header["data"] = json.loads(decompress_payload(blob_row[0]))
+        return version, header
+
+    @staticmethod
+    def _expires_at(header, now):
+        """When the entry's TTL runs out: its timestamp plus ttl_hours (0 if it has none)"""
+        try:
+            written_at = datetime.fromisoformat(header["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            written_at = now
+        return written_at + (header.get("ttl_hours") or 0) * 3600
+
+    def write(self, cache_key, header, payload=None):
+        now = time.time()
+        expires_at = self._expires_at(header, now)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if payload is not None:
+                conn.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, payload) VALUES (?, ?)",
+                    (header["blob"], compress_payload(payload))
+                )
+            # Versions come from one database-wide sequence, so a key that is deleted
+            # and written again never reuses a version another process has cached
+            conn.execute("UPDATE version_seq SET value = value + 1 WHERE id = 1")
+            version = conn.execute("SELECT value FROM version_seq WHERE id = 1").fetchone()[0]
+            conn.execute(
+                """
+                INSERT INTO entries (key, header, blob, version, updated_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    header = excluded.header,
+                    blob = excluded.blob,
+                    version = excluded.version,
+                    updated_at = excluded.updated_at,
+                    expires_at = excluded.expires_at
+                """,
+                (cache_key, encode_header(header), header["blob"], version, now, expires_at)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def list_entries(self):
+        rows = self._connect().execute(
+            "SELECT key, length(header), updated_at, blob FROM entries ORDER BY updated_at"
+        ).fetchall()
+        return [{"key": key, "size": size, "mtime": mtime, "blob": blob} for key, size, mtime, blob in rows]
+
+    def remove_expired(self, cutoff):
+        # Served by idx_entries_expires_at
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            removed = conn.execute(
+                "SELECT key, length(header) FROM entries WHERE expires_at < ?", (cutoff,)
+            ).fetchall()
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (cutoff,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    def remove(self, cache_key):
+        cursor = self._connect().execute("DELETE FROM entries WHERE key = ?", (cache_key,))
+        return cursor.rowcount > 0
+
+    def blob_size(self, blob_hash):
+        row = self._connect().execute("SELECT length(payload) FROM blobs WHERE hash = ?", (blob_hash,)).fetchone()
+        return row[0] if row else 0
+
+    def sweep(self, referenced_blobs):
+        # Entries and their blobs are written in one transaction, so any
+        # blob no entry points at is safe to delete right away
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT count(*), coalesce(sum(length(payload)), 0) FROM blobs
+                WHERE hash NOT IN (SELECT blob FROM entries WHERE blob IS NOT NULL)
+                """
+            ).fetchone()
+            conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT blob FROM entries WHERE blob IS NOT NULL)")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return {"blobs": row[0], "temp_files": 0, "bytes_reclaimed": row[1]}
+
+
+def make_cache_backend(cache_dir):
+    """Build the backend selected by settings.CACHE_BACKEND"""
+    if settings.CACHE_BACKEND == "sqlite":
+        db_path = settings.CACHE_SQLITE_PATH or os.path.join(cache_dir, "cache.sqlite3")
+        if not os.path.isabs(db_path):
+            # Relative paths are taken from the bot directory, like the cache directory
+            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), db_path)
+        return SQLiteCacheBackend(db_path)
+    if settings.CACHE_BACKEND != "file":
+        raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+    return FileCacheBackend(cache_dir)
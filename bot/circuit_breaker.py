@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import logging
+import settings
+from datetime import datetime
+from file_lock import write_atomic, lock_stats
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream endpoint whose breaker is open"""
+
+
+def describe_error(error):
+    """Error text for logs and status, naming the type when the message is empty (e.g. timeouts)"""
+    return str(error) or type(error).__name__
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail immediately. Once reset_seconds have passed a single probe call is let
+    through (half-open): success closes the breaker, failure opens it again
+    with the wait doubled, up to max_reset_seconds.
+    """
+
+    def __init__(self, name, failure_threshold=None, reset_seconds=None, max_reset_seconds=None, on_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold if failure_threshold is not None else settings.BREAKER_FAILURE_THRESHOLD
+        self.base_reset_seconds = reset_seconds if reset_seconds is not None else settings.BREAKER_RESET_SECONDS
+        self.max_reset_seconds = max_reset_seconds if max_reset_seconds is not None else settings.BREAKER_MAX_RESET_SECONDS
+        self.reset_seconds = self.base_reset_seconds
+        self.on_change = on_change
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_inflight = False
+        self.last_error = None
+        self.last_change = datetime.now()
+        self.rejected = 0
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}" + (f" ({self.last_error})" if state == OPEN else ""))
+        self.state = state
+        self.last_change = datetime.now()
+        if self.on_change:
+            self.on_change()
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a probe through"""
+        if self.state != OPEN:
+            return 0
+        return max(self.reset_seconds - (time.monotonic() - self.opened_at), 0)
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call to the endpoint may go ahead"""
+        if self.state == OPEN and self.retry_in() <= 0:
+            self._set_state(HALF_OPEN)
+        if self.state == OPEN or (self.state == HALF_OPEN and self.probe_inflight):
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} is unavailable, retrying in {self.retry_in():.0f}s")
+        if self.state == HALF_OPEN:
+            self.probe_inflight = True
+
+    def release_probe(self):
+        """Let another probe through after one was cancelled before finishing"""
+        self.probe_inflight = False
+
+    def record_success(self):
+        self.probe_inflight = False
+        self.failures = 0
+        self.reset_seconds = self.base_reset_seconds
+        self._set_state(CLOSED)
+
+    def record_failure(self, error):
+        self.probe_inflight = False
+        self.failures += 1
+        self.last_error = describe_error(error)
+        if self.state == HALF_OPEN:
+            self.reset_seconds = min(self.reset_seconds * 2, self.max_reset_seconds)
+        elif self.failures < self.failure_threshold:
+            return
+        if self.state == OPEN:
+            return
+        self.opened_at = time.monotonic()
+        self._set_state(OPEN)
+
+    def status(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in_seconds": round(self.retry_in()),
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+            "last_change": self.last_change.isoformat(),
+        }
+
+
+class NegativeCache:
+    """Remember recent upstream failures per cache key for a short time"""
+
+    def __init__(self, ttl_seconds=None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.NEGATIVE_CACHE_SECONDS
+        self._failures = {}
+
+    def get(self, cache_key):
+        """The cached error for cache_key, or None if there is none (or it expired)"""
+        failure = self._failures.get(cache_key)
+        if failure is None:
+            return None
+        if time.monotonic() >= failure[1]:
+            del self._failures[cache_key]
+            return None
+        return failure[0]
+
+    def put(self, cache_key, error):
+        self._failures[cache_key] = (describe_error(error), time.monotonic() + self.ttl_seconds)
+
+    def clear(self, cache_key):
+        self._failures.pop(cache_key, None)
+
+    def __len__(self):
+        now = time.monotonic()
+        return sum(1 for _, expires in self._failures.values() if expires > now)
+
+
+class BreakerRegistry:
+    """All endpoint breakers of the process, with a status snapshot for operators"""
+
+    def __init__(self, status_file=None):
+        self.status_file = status_file if status_file is not None else settings.UPSTREAM_STATUS_FILE
+        self.breakers = {}
+        self.negative_cache = NegativeCache()
+
+    def get(self, name):
+        """The breaker for an endpoint, created on first use"""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers[name] = CircuitBreaker(name, on_change=self.write_status)
+        return breaker
+
+    def status(self):
+        return {
+            "updated": datetime.now().isoformat(),
+            "pid": os.getpid(),
+            "breakers": {name: breaker.status() for name, breaker in self.breakers.items()},
+            "negative_cache_entries": len(self.negative_cache),
+            "file_locks": {
+                "acquired": lock_stats["acquired"],
+                "contended": lock_stats["contended"],
+                "timeouts": lock_stats["timeouts"],
+                "total_wait_seconds": round(lock_stats["total_wait_seconds"], 3),
+                "max_wait_seconds": round(lock_stats["max_wait_seconds"], 3),
+            },
+        }
+
+    def format_status(self):
+        """Human-readable status lines for the log"""
+        lines = []
+        for name, breaker in self.breakers.items():
+            line = f"Breaker {name}: {breaker.state}, {breaker.failures} failures, {breaker.rejected} rejected"
+            if breaker.state == OPEN:
+                line += f", probe in {breaker.retry_in():.0f}s"
+            if breaker.last_error:
+                line += f", last error: {breaker.last_error}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def write_status(self):
+        """Write the status snapshot where the admin panel can read it"""
+        if not self.status_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+            write_atomic(self.status_file, json.dumps(self.status(), ensure_ascii=False, indent=2).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Could not write upstream status to {self.status_file}: {e}")
+
+
+breakers = BreakerRegistry()
@@ -0,0 +1,111 @@
+import os
+import time
+import logging
+import tempfile
+import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: advisory locks are not available, writes stay atomic
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+# Time spent waiting for advisory locks in this process
+lock_stats = {
+    "acquired": 0,
+    "contended": 0,
+    "timeouts": 0,
+    "total_wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+}
+
+
+def format_lock_stats():
+    """One log line summarising lock waits in this process"""
+    average = lock_stats["total_wait_seconds"] / lock_stats["acquired"] if lock_stats["acquired"] else 0.0
+    return (
+        f"File locks: {lock_stats['acquired']} acquired, {lock_stats['contended']} contended, "
+        f"{lock_stats['timeouts']} timeouts, avg wait {average * 1000:.1f} ms, "
+        f"max wait {lock_stats['max_wait_seconds'] * 1000:.0f} ms"
+    )
+
+
+def lock_path_for(path, lock_dir=None):
+    """Lock file used to guard writes to path (in lock_dir, or a hidden .locks dir next to it)"""
+    directory, name = os.path.split(path)
+    return os.path.join(lock_dir or os.path.join(directory, ".locks"), f"{name}.lock")
+
+
+class FileLock:
+    """
+    Cross-process exclusive advisory lock (flock) on a lock file.
+
+    Used as a context manager around writes that several processes may do at
+    once: the bot, download_player_photos.py and extra webhook workers.
+    """
+
+    def __init__(self, lock_file, timeout=None):
+        self.lock_file = lock_file
+        self.timeout = timeout if timeout is not None else settings.FILE_LOCK_TIMEOUT_SECONDS
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self
+
+        os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+        self._fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        started = time.monotonic()
+        contended = False
+        while True:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                contended = True
+                if time.monotonic() - started >= self.timeout:
+                    os.close(self._fd)
+                    self._fd = None
+                    lock_stats["timeouts"] += 1
+                    raise TimeoutError(f"Timed out waiting for lock {self.lock_file}")
+                time.sleep(0.005)
+
+        waited = time.monotonic() - started
+        lock_stats["acquired"] += 1
+        lock_stats["total_wait_seconds"] += waited
+        lock_stats["max_wait_seconds"] = max(lock_stats["max_wait_seconds"], waited)
+        if contended:
+            lock_stats["contended"] += 1
+            if waited >= settings.FILE_LOCK_SLOW_WAIT_SECONDS:
+                logger.warning(f"Waited {waited * 1000:.0f} ms for lock {self.lock_file}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        return False
+
+
+def write_atomic(path, content, tmp_dir=None):
+    """Write bytes via a temp file and rename it into place, so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir or os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def locked_write(path, content, lock_dir=None):
+    """Atomically write path while holding its cross-process lock"""
+    with FileLock(lock_path_for(path, lock_dir)):
+        write_atomic(path, content)
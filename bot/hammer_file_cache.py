@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Script to hammer FileCacheBackend from several processes at once.
+
+Writer processes keep rewriting one key while reader processes read it back.
+Every payload carries its own checksum, so a reader that fails, or sees an
+index pointing at the wrong blob or a half-written file, is counted as a
+failure. The key starts out as a legacy .json file, so readers also race the
+first write that shadows it with a .cache file.
+
+Usage: python hammer_file_cache.py [seconds] [writers] [readers]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import hashlib
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache_backends import FileCacheBackend
+
+CACHE_KEY = "fixtures"
+
+# Lock waits are expected here; only failed reads and writes matter
+logging.getLogger("file_lock").setLevel(logging.ERROR)
+
+def make_entry(writer, seq):
+    """Return (header, payload bytes) of a self-checking entry"""
+    items = [f"{writer}-{seq}-{i}" for i in range(200 + seq % 300)]
+    data = {
+        "writer": writer,
+        "seq": seq,
+        "items": items,
+        "checksum": hashlib.sha256("|".join(items).encode('utf-8')).hexdigest(),
+    }
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    header = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "blob": hashlib.sha256(payload).hexdigest()}
+    return header, payload
+
+def check_entry(entry):
+    """Return a description of what is wrong with a read entry, or None"""
+    data = entry.get("data")
+    if not isinstance(data, dict) or "items" not in data:
+        return f"unexpected payload: {str(data)[:80]}"
+    if hashlib.sha256("|".join(data["items"]).encode('utf-8')).hexdigest() != data["checksum"]:
+        return f"checksum mismatch in writer {data['writer']} seq {data['seq']}"
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if entry.get("blob") and hashlib.sha256(payload).hexdigest() != entry["blob"]:
+        return f"index points at another blob (writer {data['writer']} seq {data['seq']})"
+    return None
+
+def writer(cache_dir, writer_id, deadline, results):
+    backend = FileCacheBackend(cache_dir)
+    writes, failures = 0, []
+    while time.monotonic() < deadline:
+        try:
+            backend.write(CACHE_KEY, *make_entry(writer_id, writes))
+            writes += 1
+        except Exception as e:
+            failures.append(f"write: {type(e).__name__}: {e}")
+    results.put(("writer", writes, failures[:5], len(failures)))
+
+def reader(cache_dir, deadline, results):
+    backend = FileCacheBackend(cache_dir)
+    reads, failures = 0, []
+    while time.monotonic() < deadline:
+        try:
+            version, entry = backend.read(CACHE_KEY, {})
+            problem = "missing entry" if entry is None else check_entry(entry)
+        except Exception as e:
+            problem = f"read: {type(e).__name__}: {e}"
+        reads += 1
+        if problem:
+            failures.append(problem)
+    results.put(("reader", reads, failures[:5], len(failures)))
+
+def hammer_file_cache(seconds=5.0, writers=4, readers=4):
+    """Run the hammer in a scratch cache directory; return True if nothing failed"""
+    cache_dir = tempfile.mkdtemp(prefix="hammer-cache-")
+    try:
+        # Start from a legacy pretty-printed file, as on an old deploy
+        header, payload = make_entry("seed", 0)
+        with open(os.path.join(cache_dir, f"{CACHE_KEY}.json"), 'w', encoding='utf-8') as f:
+            json.dump(dict(header, data=json.loads(payload)), f, ensure_ascii=False, indent=2)
+
+        results = multiprocessing.Queue()
+        deadline = time.monotonic() + 0.5 + seconds
+        processes = [multiprocessing.Process(target=writer, args=(cache_dir, i, deadline, results)) for i in range(writers)]
+        processes += [multiprocessing.Process(target=reader, args=(cache_dir, deadline, results)) for _ in range(readers)]
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        total = {"writer": 0, "reader": 0}
+        failed = 0
+        for role, count, samples, failures in reports:
+            total[role] += count
+            failed += failures
+            for sample in samples:
+                print(f"❌ {role}: {sample}")
+        print(f"ℹ️ {total['writer']} writes, {total['reader']} reads, {failed} failures")
+        return failed == 0 and all(process.exitcode == 0 for process in processes)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:4]]
+    seconds = args[0] if args else 5.0
+    writers = int(args[1]) if len(args) > 1 else 4
+    readers = int(args[2]) if len(args) > 2 else 4
+    print(f"🔄 Hammering FileCacheBackend for {seconds:g}s with {writers} writers and {readers} readers...")
+    if not hammer_file_cache(seconds, writers, readers):
+        sys.exit(1)
+    print("✅ No failed or torn reads")
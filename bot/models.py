@@ -0,0 +1,303 @@
+import threading
+import settings
+from collections import OrderedDict
+from dataclasses import dataclass
+from telegram import InlineKeyboardButton
+
+
+@dataclass(frozen=True)
+class Match:
+    """A fixture or result"""
+    __slots__ = (
+        "id", "competition", "venue", "kickoff_date", "kickoff_time", "tbc", "postponed",
+        "is_home", "home", "away", "home_score", "away_score",
+    )
+    id: str
+    competition: str
+    venue: str
+    kickoff_date: str
+    kickoff_time: str
+    tbc: bool
+    postponed: bool
+    is_home: bool
+    home: str
+    away: str
+    home_score: int
+    away_score: int
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(
+            record["id"], record["competition"], record["venue"], record["kickoff_date"],
+            record["kickoff_time"], record["tbc"], record["postponed"], record["is_home"],
+            record["home"], record["away"], record["home_score"], record["away_score"],
+        )
+
+    @property
+    def chelsea_goals(self):
+        return self.home_score if self.is_home else self.away_score
+
+    @property
+    def opponent_goals(self):
+        return self.away_score if self.is_home else self.home_score
+
+
+@dataclass(frozen=True)
+class Standing:
+    """One club's row in a league table"""
+    __slots__ = (
+        "position", "club", "played", "won", "drawn", "lost",
+        "goals_for", "goals_against", "goal_difference", "points", "featured", "cut_line",
+    )
+    position: int
+    club: str
+    played: int
+    won: int
+    drawn: int
+    lost: int
+    goals_for: int
+    goals_against: int
+    goal_difference: int
+    points: int
+    featured: bool
+    cut_line: bool
+
+
+@dataclass(frozen=True)
+class Table:
+    """A league table"""
+    __slots__ = ("competition", "standings")
+    competition: str
+    standings: tuple
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record["competition"], tuple(Standing(**row) for row in record["rows"]))
+
+
+@dataclass(frozen=True)
+class Competition:
+    """A competition a player has stats for"""
+    __slots__ = ("id", "name", "selected")
+    id: str
+    name: str
+    selected: bool
+
+
+@dataclass(frozen=True)
+class PlayerStats:
+    """
+    A player's stats for one season / competition.
+
+    Stat sections are tuples of (title, value) pairs, or None when upstream
+    has no such section for the player.
+    """
+    __slots__ = (
+        "competitions", "photo_url", "appearances", "goals", "goal_keeping", "pass_success",
+        "touches", "pass_percent", "scored_with", "fouls", "shots",
+    )
+    competitions: tuple
+    photo_url: str
+    appearances: tuple
+    goals: tuple
+    goal_keeping: tuple
+    pass_success: tuple
+    touches: tuple
+    pass_percent: str
+    scored_with: dict
+    fouls: dict
+    shots: dict
+
+    @classmethod
+    def from_record(cls, record):
+        def section(name):
+            pairs = record.get(name)
+            return tuple((title, value) for title, value in pairs) if pairs is not None else None
+
+        return cls(
+            tuple(Competition(comp["id"], comp["name"], comp["selected"]) for comp in record["competitions"]),
+            record.get("photo_url"),
+            section("appearances"),
+            section("goals"),
+            section("goal_keeping"),
+            section("pass_success"),
+            section("touches"),
+            record.get("pass_percent"),
+            record["scored_with"],
+            record.get("fouls"),
+            record.get("shots"),
+        )
+
+
+@dataclass(frozen=True)
+class MatchIndex:
+    """
+    Fixtures flattened and deduplicated by id, in upstream order (kickoff
+    ascending), with an id -> Match map.
+    """
+    __slots__ = ("matches", "by_id")
+    matches: tuple
+    by_id: dict
+
+    @classmethod
+    def from_matches(cls, matches):
+        by_id = {}
+        for match in matches:
+            # The first occurrence of an id wins
+            by_id.setdefault(match.id, match)
+        return cls(tuple(by_id.values()), by_id)
+
+    @classmethod
+    def from_record(cls, record):
+        return cls.from_matches(Match.from_record(match) for match in record["matches"])
+
+    def total_pages(self, per_page):
+        return (len(self.matches) + per_page - 1) // per_page
+
+    def page(self, page, per_page):
+        """(matches on page, 0-based index of the first of them) for a 1-based page"""
+        start = (page - 1) * per_page
+        return self.matches[start:start + per_page], start
+
+
+@dataclass(frozen=True)
+class ResultIndex(MatchIndex):
+    """Results newest first: the latest result, then the rest without it"""
+    __slots__ = ()
+
+    @classmethod
+    def from_record(cls, record):
+        matches = [Match.from_record(match) for match in record["matches"]]
+        if record.get("latest"):
+            matches.insert(0, Match.from_record(record["latest"]))
+        return cls.from_matches(matches)
+
+
+@dataclass(frozen=True)
+class Player:
+    """A squad member from settings.PLAYERS"""
+    __slots__ = ("id", "full_name", "number", "display_name", "button_label")
+    id: str
+    full_name: str
+    number: int
+    display_name: str
+    button_label: str
+
+    @classmethod
+    def from_setting(cls, player):
+        number = player["number"]
+        full_name = player["full_name"]
+        return cls(
+            player["id"], full_name, number,
+            f"#{number} {full_name}" if number else full_name,
+            f"{number} {full_name}" if number else full_name,
+        )
+
+
+class PlayerRegistry:
+    """
+    The squad, built once at import and indexed by id, full name and shirt number.
+
+    Button rows of the player list (two players per row) are built on first
+    use per (page, per_page) and shared from then on.
+    """
+
+    def __init__(self, players):
+        self.players = tuple(Player.from_setting(player) for player in players)
+        self.by_id = {player.id: player for player in self.players}
+        self.by_name = {}
+        self.by_number = {}
+        for player in self.players:
+            self.by_name.setdefault(player.full_name, player)
+            if player.number:
+                self.by_number.setdefault(player.number, player)
+        self._button_rows = {}
+
+    def __iter__(self):
+        return iter(self.players)
+
+    def __len__(self):
+        return len(self.players)
+
+    def get(self, player_id):
+        """The player with this id, or None"""
+        return self.by_id.get(player_id)
+
+    def total_pages(self, per_page):
+        return (len(self.players) + per_page - 1) // per_page
+
+    def button_rows(self, page, per_page):
+        """Rows of InlineKeyboardButtons (label -> player id) for a 1-based page of the list"""
+        rows = self._button_rows.get((page, per_page))
+        if rows is None:
+            start = (page - 1) * per_page
+            buttons = [
+                InlineKeyboardButton(player.button_label, callback_data=player.id)
+                for player in self.players[start:start + per_page]
+            ]
+            rows = tuple(tuple(buttons[i:i + 2]) for i in range(0, len(buttons), 2))
+            if rows:
+                # Only pages that exist, whatever page numbers callbacks carry
+                self._button_rows[(page, per_page)] = rows
+        return rows
+
+
+player_registry = PlayerRegistry(settings.PLAYERS)
+
+
+class DomainCache:
+    """
+    Domain objects built from cached records, once per cache version.
+
+    Keyed by (model, version), where version is the content hash of the
+    cache entry, so every request for the same data shares the same objects
+    and a changed entry is rebuilt on first use.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries if max_entries is not None else settings.DOMAIN_CACHE_MAX_ENTRIES
+        self._objects = OrderedDict()
+        self._lock = threading.Lock()
+        self.built = 0
+
+    def get(self, model, version, record):
+        """model.from_record(record), shared by every caller with the same version"""
+        if version is None:
+            # Entries without a content hash (older cache formats) can't be shared safely
+            self.built += 1
+            return model.from_record(record)
+        key = (model.__name__, version)
+        with self._lock:
+            obj = self._objects.get(key)
+            if obj is not None:
+                self._objects.move_to_end(key)
+                return obj
+        obj = model.from_record(record)
+        self.built += 1
+        with self._lock:
+            self._objects[key] = obj
+            while len(self._objects) > self.max_entries:
+                self._objects.popitem(last=False)
+        return obj
+
+domain_cache = DomainCache()
+
+
+def fixture_index_from(result):
+    """MatchIndex for a fixtures fetch_with_cache result"""
+    return domain_cache.get(MatchIndex, result.get("version"), result["data"])
+
+
+def result_index_from(result):
+    """ResultIndex for a recent_results fetch_with_cache result"""
+    return domain_cache.get(ResultIndex, result.get("version"), result["data"])
+
+
+def table_from(result):
+    """Table for a league_table_* fetch_with_cache result"""
+    return domain_cache.get(Table, result.get("version"), result["data"])
+
+
+def player_stats_from(result):
+    """PlayerStats for a player_stats_* fetch_with_cache result"""
+    return domain_cache.get(PlayerStats, result.get("version"), result["data"])
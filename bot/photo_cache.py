@@ -0,0 +1,245 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+import settings
+from dataclasses import dataclass
+from telegram.error import BadRequest
+from file_lock import FileLock, lock_path_for, write_atomic, locked_write
+from models import player_registry
+
+
+logger = logging.getLogger(__name__)
+
+PLAYER_PHOTO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'players')
+PHOTO_EXTENSIONS = ("jpg", "jpeg", "png", "webp")
+
+
+def photo_candidates(player):
+    """File names a player's photo may have, in order of preference"""
+    slug = player.full_name.lower().replace(' ', '-')
+    return [f"{name}.{extension}" for name in (player.id, slug) for extension in PHOTO_EXTENSIONS]
+
+
+@dataclass(frozen=True)
+class PlayerPhoto:
+    """A player's local photo as seen by the last manifest scan"""
+    __slots__ = ("path", "size", "mtime_ns", "sha256", "data")
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    data: bytes
+
+    @classmethod
+    def from_bytes(cls, path, stat, data, resident_max_bytes):
+        return cls(
+            path, stat.st_size, stat.st_mtime_ns, hashlib.sha256(data).hexdigest(),
+            data if stat.st_size <= resident_max_bytes else None,
+        )
+
+    def read(self):
+        """The photo bytes, from memory when resident"""
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as photo_file:
+            return photo_file.read()
+
+
+class PhotoManifest:
+    """
+    Player id -> PlayerPhoto (path, size, content hash) for static/players.
+
+    Built at startup and refreshed by a periodic job or on demand, so
+    handlers look photos up without touching the filesystem. A refresh
+    scans the directory once and only rehashes files whose size or mtime
+    changed. Photos up to PHOTO_RESIDENT_MAX_KB are kept in memory.
+    """
+
+    def __init__(self, photo_dir=None, resident_max_bytes=None):
+        self.photo_dir = photo_dir or PLAYER_PHOTO_DIR
+        self.resident_max_bytes = resident_max_bytes if resident_max_bytes is not None else settings.PHOTO_RESIDENT_MAX_KB * 1024
+        self.photos = {}
+        self._lock = threading.Lock()
+
+    def get(self, player_id):
+        """The player's photo, or None when there is none locally"""
+        return self.photos.get(player_id)
+
+    def _load(self, path, stat):
+        with open(path, 'rb') as photo_file:
+            data = photo_file.read()
+        return PlayerPhoto.from_bytes(path, stat, data, self.resident_max_bytes)
+
+    def refresh(self):
+        """Rescan the photo directory; returns the ids of players whose photo changed"""
+        with self._lock:
+            try:
+                files = {entry.name: entry for entry in os.scandir(self.photo_dir) if entry.is_file()}
+            except FileNotFoundError:
+                files = {}
+            photos = {}
+            for player in player_registry:
+                for name in photo_candidates(player):
+                    entry = files.get(name)
+                    if entry is None:
+                        continue
+                    try:
+                        stat = entry.stat()
+                        current = self.photos.get(player.id)
+                        if current is not None and (current.path, current.size, current.mtime_ns) == (entry.path, stat.st_size, stat.st_mtime_ns):
+                            photos[player.id] = current
+                        else:
+                            photos[player.id] = self._load(entry.path, stat)
+                    except OSError as e:
+                        logger.warning(f"Could not read photo {entry.path}: {e}")
+                    break
+            changed = {
+                player_id for player_id in photos.keys() | self.photos.keys()
+                if getattr(photos.get(player_id), "sha256", None) != getattr(self.photos.get(player_id), "sha256", None)
+            }
+            self.photos = photos
+        if changed:
+            resident = sum(1 for photo in photos.values() if photo.data is not None)
+            logger.info(f"Photo manifest: {len(photos)} photos ({resident} in memory), {len(changed)} changed")
+        return changed
+
+    async def arefresh(self, context=None):
+        """refresh() off the event loop (usable as a PTB job callback)"""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self.refresh)
+        except Exception as e:
+            logger.error(f"Photo manifest refresh failed: {e}")
+            return set()
+
+    def put(self, player_id, path, data):
+        """Record a photo the bot has just written, without rescanning"""
+        photo = PlayerPhoto.from_bytes(path, os.stat(path), data, self.resident_max_bytes)
+        with self._lock:
+            self.photos = {**self.photos, player_id: photo}
+        return photo
+
+    def save(self, player_id, path, data):
+        """Write a downloaded photo under its lock and record it; blocking, run it off the loop"""
+        locked_write(path, data, lock_dir=settings.PHOTO_LOCK_DIR)
+        return self.put(player_id, path, data)
+
+photo_manifest = PhotoManifest()
+
+
+class PhotoFileIds:
+    """
+    Telegram file_ids of uploaded player photos, persisted across restarts.
+
+    Each file_id is stored with the content hash of the photo it was
+    uploaded from, so a changed photo no longer matches and is uploaded
+    again. Several processes (bot replicas, warm_photo_cache.py) share the
+    file, so save() merges this process's changes into it under a lock.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.PHOTO_FILE_IDS_FILE
+        self.entries = {}
+        self.stats = {"hits": 0, "uploads": 0, "rejected": 0}
+        # player_id -> entry stored (or None if invalidated) since the last save
+        self._changes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def dirty(self):
+        return bool(self._changes)
+
+    def _read(self):
+        """Return the map on disk ({} if missing or unreadable)"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Could not read photo file_ids from {self.path}: {e}")
+            return {}
+
+    def load(self):
+        """Read the map from disk; blocking, the bot runs it from post_init off the loop"""
+        self.entries = self._read()
+
+    def get(self, player_id, sha256):
+        """file_id uploaded from this version of the player's photo, or None"""
+        entry = self.entries.get(player_id)
+        if entry is None or entry.get("sha256") != sha256:
+            return None
+        return entry.get("file_id")
+
+    def remember(self, player_id, sha256, message):
+        """Store the file_id of a photo message just sent (in memory until save())"""
+        if message is None or not message.photo:
+            return
+        # The largest size is the original upload
+        entry = {"file_id": message.photo[-1].file_id, "sha256": sha256}
+        with self._lock:
+            self.entries[player_id] = entry
+            self._changes[player_id] = entry
+        self.stats["uploads"] += 1
+
+    def invalidate(self, player_id):
+        with self._lock:
+            if self.entries.pop(player_id, None) is not None:
+                self._changes[player_id] = None
+
+    @staticmethod
+    def _apply(entries, changes):
+        for player_id, entry in changes.items():
+            if entry is None:
+                entries.pop(player_id, None)
+            else:
+                entries[player_id] = entry
+        return entries
+
+    def save(self):
+        """
+        Merge changes since the last save into the file and pick up file_ids
+        other processes stored; blocking, run it off the loop.
+        """
+        with self._lock:
+            changes, self._changes = self._changes, {}
+        if not changes:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with FileLock(lock_path_for(self.path)):
+                entries = self._apply(self._read(), changes)
+                write_atomic(self.path, json.dumps(entries, indent=2).encode('utf-8'))
+        except Exception as e:
+            with self._lock:
+                self._changes = {**changes, **self._changes}
+            logger.warning(f"Could not write photo file_ids to {self.path}: {e}")
+            return
+        with self._lock:
+            # Changes made while the file was written stay on top until the next save
+            self.entries = self._apply(entries, self._changes)
+
+    async def send(self, bot, chat_id, player_id, photo, **kwargs):
+        """
+        send_photo a player's PlayerPhoto, by file_id when it was uploaded before.
+
+        A file_id Telegram rejects is forgotten and the photo uploaded again.
+        """
+        file_id = self.get(player_id, photo.sha256)
+        if file_id is not None:
+            try:
+                message = await bot.send_photo(chat_id=chat_id, photo=file_id, **kwargs)
+                self.stats["hits"] += 1
+                return message
+            except BadRequest as e:
+                logger.warning(f"Telegram rejected the cached photo of {player_id}, uploading it again: {e}")
+                self.stats["rejected"] += 1
+                self.invalidate(player_id)
+
+        message = await bot.send_photo(chat_id=chat_id, photo=photo.read(), **kwargs)
+        self.remember(player_id, photo.sha256, message)
+        return message
+
+photo_file_ids = PhotoFileIds()
@@ -0,0 +1,170 @@
+import json
+import logging
+import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of projected records changes; older entries are re-projected on load
+PROJECTION_VERSION = 1
+
+# Stat sections shown by player_info (upstream key -> record key), kept as [title, value] pairs
+PLAYER_STAT_SECTIONS = {
+    "appearances": "appearances",
+    "goals": "goals",
+    "goalKeeping": "goal_keeping",
+    "passSuccess": "pass_success",
+    "touches": "touches",
+}
+SCORED_WITH_KEYS = {
+    "head": "head",
+    "leftFoot": "left_foot",
+    "rightFoot": "right_foot",
+    "penalties": "penalties",
+    "freeKicks": "free_kicks",
+}
+FOUL_KEYS = {
+    "yellowCards": "yellow_cards",
+    "redCards": "red_cards",
+    "foulsDrawn": "fouls_drawn",
+}
+
+
+def project_match(match):
+    """Compact record of a fixture or result item"""
+    match_up = match.get('matchUp') or {}
+    home = match_up.get('home') or {}
+    away = match_up.get('away') or {}
+    return {
+        "id": match.get('id'),
+        "competition": match.get('competition'),
+        "venue": match.get('venue'),
+        "kickoff_date": match.get('kickoffDate'),
+        "kickoff_time": match.get('kickoffTime'),
+        "tbc": bool(match.get('tbc', False)),
+        "postponed": bool(match.get('postponed', False)),
+        "is_home": bool(match_up.get('isHomeFixture')),
+        "home": home.get('clubShortName'),
+        "away": away.get('clubShortName'),
+        "home_score": home.get('score'),
+        "away_score": away.get('score'),
+    }
+
+
+def project_matches(data):
+    """fixtures / recent_results: matches in upstream order, plus the latest result if present"""
+    matches = [project_match(match) for group in data.get('items', []) for match in group.get('items', [])]
+    latest = (data.get('latestResult') or {}).get('fixture')
+    return {
+        "latest": project_match(latest) if latest else None,
+        "matches": matches,
+    }
+
+
+def project_table(data):
+    """league_table_*: competition title and one row per club"""
+    items = data.get('items', [])
+    if not items:
+        return {"competition": None, "rows": []}
+    rows = items[0]['standings']['tables'][0]['rows']
+    return {
+        "competition": items[0].get('competitionDetails', {}).get('title'),
+        "rows": [
+            {
+                "position": row['position'],
+                "club": row['clubShortName'],
+                "played": row['played'],
+                "won": row['won'],
+                "drawn": row['drawn'],
+                "lost": row['lost'],
+                "goals_for": row.get('goalsFor'),
+                "goals_against": row.get('goalsAgainst'),
+                "goal_difference": row.get('goalDifference'),
+                "points": row['points'],
+                "featured": bool(row.get('featuredTeam')),
+                "cut_line": bool(row.get('cutLine')),
+            }
+            for row in rows
+        ],
+    }
+
+
+def _photo_url(data):
+    for section in ('goalKeeping', 'goals', 'passSuccess'):
+        try:
+            return data[section]['playerAvatar']['image']['file']['url']
+        except (KeyError, TypeError):
+            continue
+    return None
+
+
+def project_player_stats(data):
+    """player_stats_*: the stat values player_info shows, the competition list and the photo URL"""
+    record = {
+        "competitions": [
+            {"id": comp.get('value'), "name": comp.get('displayText'), "selected": comp.get('selectedValue', False)}
+            for comp in data.get('competitions', [])
+        ],
+        "photo_url": _photo_url(data),
+    }
+    for section, key in PLAYER_STAT_SECTIONS.items():
+        if section in data and 'stats' in data[section]:
+            record[key] = [[stat.get('title', ''), stat.get('value', '0')] for stat in data[section]['stats']]
+        else:
+            record[key] = None
+    record["pass_percent"] = (data.get('passSuccess') or {}).get('playerRankingPercent')
+    scored_with = data.get('scoredWith') or {}
+    record["scored_with"] = {key: scored_with.get(name, {}).get('value', '0') for name, key in SCORED_WITH_KEYS.items()}
+    fouls = data.get('fouls')
+    record["fouls"] = {key: fouls.get(name, {}).get('value', '0') for name, key in FOUL_KEYS.items()} if fouls is not None else None
+    shots = data.get('shots')
+    record["shots"] = {
+        "on_target": shots.get('playerShotsOnTarget', '0'),
+        "off_target": shots.get('playerShotsOffTarget', '0'),
+    } if shots is not None else None
+    return record
+
+
+def projector_for(cache_key):
+    """Projection function for a cache key, or None to store the payload as-is"""
+    if cache_key in ("fixtures", "recent_results"):
+        return project_matches
+    if cache_key.startswith("league_table_"):
+        return project_table
+    if cache_key.startswith("player_stats_"):
+        return project_player_stats
+    return None
+
+
+def is_projected(data):
+    return isinstance(data, dict) and data.get("projection") == PROJECTION_VERSION
+
+
+def project(cache_key, data):
+    """Turn a raw upstream payload into the compact record cached for cache_key"""
+    projector = projector_for(cache_key)
+    if projector is None or is_projected(data):
+        return data
+    record = projector(data)
+    record["projection"] = PROJECTION_VERSION
+    if settings.CACHE_KEEP_RAW:
+        record["raw"] = data
+    return record
+
+
+def project_payload(cache_key, body):
+    """Parse an upstream response body and project it (runs on the cache I/O executor)"""
+    return project(cache_key, json.loads(body))
+
+
+def ensure_projected(cache_key, data):
+    """Project entries cached before projections existed (or under an older PROJECTION_VERSION)"""
+    if projector_for(cache_key) is None or is_projected(data):
+        return data
+    if isinstance(data, dict) and "projection" in data:
+        if data.get("raw") is None:
+            # An older projection without the raw payload can't be re-projected
+            raise ValueError(f"Cached {cache_key} has projection {data['projection']} and no raw payload")
+        data = data["raw"]
+    logger.info(f"Projecting raw cached payload for {cache_key}")
+    return project(cache_key, data)
@@ -0,0 +1,56 @@
+import logging
+import settings
+from collections import OrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """
+    Rendered screens (message text and keyboard), keyed by (screen, variant, version).
+
+    variant tells apart renderings of the same data (a page number, a
+    callback) and version is the content hash of the cache entry the screen
+    is built from. When a screen is rendered from a new version, everything
+    rendered from its older versions is dropped.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries if max_entries is not None else settings.RENDER_CACHE_MAX_ENTRIES
+        self._screens = OrderedDict()
+        self._versions = {}
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    def _invalidate(self, screen):
+        stale = [key for key in self._screens if key[0] == screen]
+        for key in stale:
+            del self._screens[key]
+        self.stats["invalidated"] += len(stale)
+
+    def get(self, screen, variant, version, render):
+        """Return the cached render() result for (screen, variant, version), rendering it on a miss"""
+        if version is None:
+            # No content hash to tell versions apart (older cache formats)
+            self.stats["misses"] += 1
+            return render()
+        key = (screen, variant, version)
+        rendered = self._screens.get(key)
+        if rendered is not None:
+            self._screens.move_to_end(key)
+            self.stats["hits"] += 1
+            return rendered
+
+        self.stats["misses"] += 1
+        rendered = render()
+        if self._versions.get(screen) != version:
+            if screen in self._versions:
+                logger.info(f"{screen} changed, dropping its rendered pages")
+            self._invalidate(screen)
+            self._versions[screen] = version
+        self._screens[key] = rendered
+        while len(self._screens) > self.max_entries:
+            self._screens.popitem(last=False)
+        return rendered
+
+render_cache = RenderCache()
@@ -0,0 +1,91 @@
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from models import player_registry
+
+
+# Static screens, built once at import and shared by every handler call.
+# InlineKeyboardMarkup / InlineKeyboardButton are immutable, so sharing them is safe.
+
+MAIN_MENU_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📅 Təqvim", callback_data="Təqvim"),
+        InlineKeyboardButton("📊 Cədvəl", callback_data="table")
+    ],
+    [
+        InlineKeyboardButton("⚽ Son Nəticələr", callback_data="results"),
+        InlineKeyboardButton("👥 Oyunçular", callback_data="players")
+    ],
+    [
+        InlineKeyboardButton("📺 Canlı Yayım", callback_data="live"),
+        InlineKeyboardButton("ℹ️ Haqqında", callback_data="about")
+    ]
+])
+MAIN_MENU_TEXT = (
+    "CHELSEA-nin ölkəmizdəki azərkeşləri üçün hazırlanmış bot\n\n"
+    "Nə görmək istəyirsiniz?"
+)
+# Follows the per-user greeting of /start
+WELCOME_PROMPT = "Nə görmək istəyirsiniz?\n\n"
+
+COMING_SOON_TEXT = (
+    "🚧 **Tezliklə** 🚧\n\n"
+    "Bu xüsusiyyət hazırda inkişaf mərhələsindədir.\n"
+    "Tezliklə əlavə olunacaq! 🔄"
+)
+COMING_SOON_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("◀️ Geri", callback_data="back_main")]])
+
+HELP_TEXT = (
+    "🤖 <b>CFC Azerbaijan Bot</b>\n\n"
+    "📋 <b>Özəlliklər</b>\n\n"
+    "🏠 /start - Əsas menyu\n"
+    "❓ /komek - Özəlliklərin siyahısı\n\n"
+    "📅 /teqvim - Oyun təqvimi\n"
+    "📊 /cedvel - Turnir cədvəli\n"
+    "⚽ /hesablar - Son nəticələr\n"
+    "👥 /komanda - Oyunçular\n"
+    "📺 /canli - Canlı yayım\n"
+    "ℹ️ /haqqinda - Haqqında\n\n"
+    "💡 <b>Məsləhət:</b> Əmrləri yazmaq üçün / işarəsindən istifadə edin!"
+)
+HELP_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("🏠 Ana Menyu", callback_data="back_main")]])
+
+PLAYERS_PER_PAGE = 10
+
+
+def build_player_list(page):
+    """Message text and keyboard of a page of the player list"""
+    total_pages = player_registry.total_pages(PLAYERS_PER_PAGE)
+
+    msg = "👥 <b>CHELSEA OYUNÇULARI</b> 👥\n"
+    msg += "═" * 25 + "\n\n"
+    msg += f"📋 Səhifə {page}/{total_pages}\n\n"
+
+    # Player buttons, 2 per row
+    keyboard = [list(row) for row in player_registry.button_rows(page, PLAYERS_PER_PAGE)]
+
+    # Navigation buttons
+    nav_row = []
+    if page > 1:
+        nav_row.append(InlineKeyboardButton("⬅️ Əvvəlki", callback_data=f"players_page_{page-1}"))
+    if page < total_pages:
+        nav_row.append(InlineKeyboardButton("Növbəti ➡️", callback_data=f"players_page_{page+1}"))
+    if nav_row:
+        keyboard.append(nav_row)
+
+    # Action buttons
+    keyboard.append([
+        InlineKeyboardButton("◀️ Geri", callback_data="back_main"),
+        InlineKeyboardButton("🔄 Yenilə", callback_data="players")
+    ])
+    return msg, InlineKeyboardMarkup(keyboard)
+
+
+PLAYER_LIST_SCREENS = {
+    page: build_player_list(page)
+    for page in range(1, player_registry.total_pages(PLAYERS_PER_PAGE) + 1)
+}
+
+
+def player_list(page):
+    """Prebuilt player list page; pages that don't exist are built on the fly"""
+    screen = PLAYER_LIST_SCREENS.get(page)
+    return screen if screen is not None else build_player_list(page)
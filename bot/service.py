@@ -1,139 +1,614 @@
 import os
+import re
+import random
 import json
-import aiohttp
+import hashlib
+import time
 import asyncio
 import logging
+import threading
 import settings
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from cache_backends import make_cache_backend
+from ttl_policy import ttl_policy
+from circuit_breaker import breakers, CircuitOpenError, describe_error
+from file_lock import lock_stats, format_lock_stats
+from upstream import http_session, upstream_client, UpstreamThrottled, TRANSPORT_ERRORS
+from projections import project_payload, ensure_projected
+from models import player_registry
 
 
 logger = logging.getLogger(__name__)
 
+# Cache keys the bot still produces; anything else in the cache dir is orphaned
+ACTIVE_CACHE_KEY_PATTERNS = [
+    re.compile(r"^fixtures$"),
+    re.compile(r"^recent_results$"),
+    re.compile(r"^league_table_(pl|cl)$"),
+    re.compile(r"^player_stats_(?P<player_id>\w+?)_season_\d+(_comp_\d+)?$"),
+]
+
+def is_active_cache_key(cache_key):
+    """Check whether a cache key is one the bot can still ask for"""
+    for pattern in ACTIVE_CACHE_KEY_PATTERNS:
+        match = pattern.match(cache_key)
+        if match:
+            player_id = match.groupdict().get("player_id")
+            return player_id is None or player_id in player_registry.by_id
+    return False
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight task"""
+
+    def __init__(self):
+        self._inflight = {}
+        self.deduplicated = 0
+
+    async def run(self, key, coro_factory):
+        """Run coro_factory() for key, or join the call already in flight"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.deduplicated += 1
+            logger.debug(f"Joining in-flight call for {key} ({self.deduplicated} deduplicated so far)")
+        else:
+            task = asyncio.ensure_future(coro_factory())
+            self._inflight[key] = task
+
+            def _done(finished, key=key):
+                if self._inflight.get(key) is finished:
+                    del self._inflight[key]
+            task.add_done_callback(_done)
+
+        # Shield so one cancelled waiter doesn't cancel the request for everyone else
+        return await asyncio.shield(task)
+
+    def is_inflight(self, key):
+        """Check whether a call for key is currently running"""
+        return key in self._inflight
+
+
 class APICache:
-    def __init__(self, cache_dir="cache"):
+    def __init__(self, cache_dir="cache", memory_max_entries=None, memory_recheck_seconds=None, backend=None, normalise=None):
         # Use absolute path relative to this file's location
         if not os.path.isabs(cache_dir):
             cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), cache_dir)
         self.cache_dir = cache_dir
-        self.ensure_cache_dir()
-        
-    def ensure_cache_dir(self):
-        """Create cache directory if it doesn't exist"""
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-    
-    def get_cache_file_path(self, cache_key):
-        """Get the full path for a cache file"""
-        return os.path.join(self.cache_dir, f"{cache_key}.json")
+        self.backend = backend if backend is not None else make_cache_backend(cache_dir)
+        # Applied to payloads read from the backend, e.g. to project entries cached in an older shape
+        self.normalise = normalise
+
+        # In-process LRU tier: cache_key -> (version, checked_at, cache_data, cache_time)
+        self.memory_max_entries = memory_max_entries if memory_max_entries is not None else settings.MEMORY_CACHE_MAX_ENTRIES
+        self.memory_recheck_seconds = memory_recheck_seconds if memory_recheck_seconds is not None else settings.MEMORY_CACHE_RECHECK_SECONDS
+        self._memory = OrderedDict()
+        # Parsed payloads shared by every remembered key with the same blob
+        self._blobs = {}
+        self._blob_refs = {}
+        # The memory tier is shared with the I/O executor threads
+        self._lock = threading.RLock()
+        self._executor = None
+        self._read_flight = SingleFlight()
+
+    def _remember(self, cache_key, version, cache_data):
+        """Store a parsed entry in the memory tier, evicting the least recently used"""
+        try:
+            cache_time = datetime.fromisoformat(cache_data["timestamp"])
+        except Exception:
+            cache_time = None
+
+        with self._lock:
+            # Keys with the same blob share one parsed payload
+            blob_hash = cache_data.get("blob")
+            if blob_hash:
+                if blob_hash in self._blobs:
+                    cache_data["data"] = self._blobs[blob_hash]
+                else:
+                    self._blobs[blob_hash] = cache_data["data"]
+                self._blob_refs[blob_hash] = self._blob_refs.get(blob_hash, 0) + 1
+
+            self.forget(cache_key)
+            self._memory[cache_key] = (version, time.monotonic(), cache_data, cache_time)
+            while len(self._memory) > self.memory_max_entries:
+                evicted_key = next(iter(self._memory))
+                self.forget(evicted_key)
+        return cache_time
+
+    def forget(self, cache_key):
+        """Drop an entry from the memory tier"""
+        with self._lock:
+            entry = self._memory.pop(cache_key, None)
+            if entry is None:
+                return
+            blob_hash = entry[2].get("blob")
+            if blob_hash and blob_hash in self._blob_refs:
+                self._blob_refs[blob_hash] -= 1
+                if self._blob_refs[blob_hash] <= 0:
+                    del self._blob_refs[blob_hash]
+                    self._blobs.pop(blob_hash, None)
+
+    def _memory_hit(self, cache_key):
+        """
+        Return (entry, hit) from the memory tier without any I/O.
+
+        hit is True when the entry was checked against the backend less than
+        memory_recheck_seconds ago and can be served as-is.
+        """
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is None:
+                return None, False
+            if time.monotonic() - entry[1] < self.memory_recheck_seconds:
+                self._memory.move_to_end(cache_key)
+                return entry, True
+            return entry, False
+
+    def _store(self, cache_key, header, payload, cache_data):
+        """Write an entry through the backend and refresh the memory tier"""
+        version = self.backend.write(cache_key, header, payload)
+        self._remember(cache_key, version, cache_data)
     
-    def save_cache(self, cache_key, data):
-        """Save data to cache with timestamp"""
-        cache_data = {
-            "timestamp": datetime.now().isoformat(),
-            "data": data
-        }
+    def save_cache(self, cache_key, data, etag=None, last_modified=None, ttl_hours=None, ttl_reason=None):
+        """Save data to cache with timestamp, upstream validators and the TTL it was fetched under; returns the content hash"""
+        header = {"timestamp": datetime.now().isoformat()}
+        if etag:
+            header["etag"] = etag
+        if last_modified:
+            header["last_modified"] = last_modified
+        if ttl_hours is not None:
+            header["ttl_hours"] = ttl_hours
+            header["ttl_reason"] = ttl_reason
         
         try:
-            cache_file = self.get_cache_file_path(cache_key)
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            header["blob"] = hashlib.sha256(payload).hexdigest()
+            self._store(cache_key, header, payload, dict(header, data=data))
             logger.info(f"Cached data for {cache_key}")
+            return header["blob"]
         except Exception as e:
+            self.forget(cache_key)
             logger.error(f"Failed to save cache for {cache_key}: {e}")
-    
-    def load_cache(self, cache_key):
-        """Load data from cache if it exists"""
+            return None
+
+    def touch_cache(self, cache_key, ttl_hours=None, ttl_reason=None):
+        """Mark an existing entry as fresh again (e.g. after a 304 Not Modified)"""
+        cache_data = self.load_cache(cache_key)
+        if not cache_data:
+            return None
+
+        if ttl_hours is None:
+            ttl_hours, ttl_reason = cache_data.get("ttl_hours"), cache_data.get("ttl_reason")
+
+        if not cache_data.get("blob"):
+            # Older format without a blob: rewriting it also migrates it
+            self.save_cache(
+                cache_key,
+                cache_data["data"],
+                etag=cache_data.get("etag"),
+                last_modified=cache_data.get("last_modified"),
+                ttl_hours=ttl_hours,
+                ttl_reason=ttl_reason
+            )
+            return self.load_cache(cache_key)
+
+        # Only the header changes; the stored blob is reused as-is
+        header = {key: value for key, value in cache_data.items() if key != "data"}
+        header["timestamp"] = datetime.now().isoformat()
+        if ttl_hours is not None:
+            header["ttl_hours"] = ttl_hours
+            header["ttl_reason"] = ttl_reason
         try:
-            cache_file = self.get_cache_file_path(cache_key)
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                return cache_data
+            cache_data = dict(header, data=cache_data["data"])
+            self._store(cache_key, header, None, cache_data)
+        except Exception as e:
+            self.forget(cache_key)
+            logger.error(f"Failed to refresh cache for {cache_key}: {e}")
+            return None
+        return cache_data
+
+    def get_entry(self, cache_key):
+        """
+        Return (cache_data, cache_time) for a key, or (None, None).
+
+        Entries are served from memory. The backend's version token is only
+        checked once the entry is older than memory_recheck_seconds, and the
+        entry is only re-read when that version has changed (e.g. another
+        process wrote it).
+        """
+        entry, hit = self._memory_hit(cache_key)
+        if hit:
+            return entry[2], entry[3]
+
+        if entry is not None:
+            version, checked_at, cache_data, cache_time = entry
+            try:
+                current_version = self.backend.version(cache_key)
+            except Exception as e:
+                logger.error(f"Failed to check cache for {cache_key}: {e}")
+                current_version = None
+            if current_version is not None and current_version == version:
+                with self._lock:
+                    if self._memory.get(cache_key) is entry:
+                        self._memory[cache_key] = (version, time.monotonic(), cache_data, cache_time)
+                        self._memory.move_to_end(cache_key)
+                return cache_data, cache_time
+
+        try:
+            version, cache_data = self.backend.read(cache_key, self._blobs)
+            if cache_data is not None and self.normalise is not None:
+                cache_data["data"] = self.normalise(cache_key, cache_data["data"])
         except Exception as e:
             logger.error(f"Failed to load cache for {cache_key}: {e}")
-        return None
+            version, cache_data = None, None
+        if cache_data is None:
+            self.forget(cache_key)
+            return None, None
+
+        cache_time = self._remember(cache_key, version, cache_data)
+        return cache_data, cache_time
+    
+    def load_cache(self, cache_key):
+        """Load data from cache if it exists"""
+        cache_data, _ = self.get_entry(cache_key)
+        return cache_data
     
     def is_cache_fresh(self, cache_key, max_age_hours):
         """Check if cache is still fresh (within max_age_hours)"""
-        cache_data = self.load_cache(cache_key)
-        if not cache_data:
-            return False
-        
-        try:
-            cache_time = datetime.fromisoformat(cache_data["timestamp"])
-            age = datetime.now() - cache_time
-            return age < timedelta(hours=max_age_hours)
-        except Exception:
+        age = self.get_cache_age(cache_key)
+        if age is None:
             return False
+        return age < max_age_hours
     
     def get_cache_age(self, cache_key):
         """Get how old the cache is in hours"""
-        cache_data = self.load_cache(cache_key)
-        if not cache_data:
+        cache_data, cache_time = self.get_entry(cache_key)
+        if not cache_data or cache_time is None:
             return None
         
-        try:
-            cache_time = datetime.fromisoformat(cache_data["timestamp"])
-            age = datetime.now() - cache_time
-            return age.total_seconds() / 3600  # Return hours
-        except Exception:
+        age = datetime.now() - cache_time
+        return age.total_seconds() / 3600  # Return hours
+
+    def _remove_entry(self, entry):
+        """Delete one stored entry; returns True if it was removed"""
+        removed = self.backend.remove(entry["key"])
+        self.forget(entry["key"])
+        return removed
+
+    def enforce_budget(self, max_entries=None, max_bytes=None, max_age_days=None):
+        """
+        Prune the cache and report what was reclaimed.
+
+        Removes entries whose TTL ran out more than max_age_days ago (or, on
+        backends that don't track expiry, that weren't written for
+        max_age_days), orphaned keys, then the least recently written entries
+        until the cache fits within max_entries and max_bytes, and finally
+        blobs nothing points at.
+        """
+        max_entries = max_entries if max_entries is not None else settings.CACHE_MAX_ENTRIES
+        max_bytes = max_bytes if max_bytes is not None else settings.CACHE_MAX_BYTES
+        max_age_days = max_age_days if max_age_days is not None else settings.CACHE_MAX_AGE_DAYS
+        report = {"orphaned": 0, "expired": 0, "evicted": 0, "bytes_reclaimed": 0}
+        now = time.time()
+
+        # Stale entries are still served while upstream is down, so only drop them well past their TTL
+        expired = self.backend.remove_expired(now - max_age_days * 86400) if max_age_days else None
+        for cache_key, size in expired or ():
+            self.forget(cache_key)
+            report["expired"] += 1
+            report["bytes_reclaimed"] += size
+
+        kept = []
+        for entry in self.backend.list_entries():
+            if not is_active_cache_key(entry["key"]):
+                reason = "orphaned"
+            elif expired is None and max_age_days and now - entry["mtime"] > max_age_days * 86400:
+                reason = "expired"
+            else:
+                kept.append(entry)
+                continue
+            if self._remove_entry(entry):
+                report[reason] += 1
+                report["bytes_reclaimed"] += entry["size"]
+
+        # Shared blobs count once towards the budget, however many keys use them
+        blob_refs = {}
+        for entry in kept:
+            if entry["blob"]:
+                blob_refs[entry["blob"]] = blob_refs.get(entry["blob"], 0) + 1
+        blob_sizes = {blob_hash: self.backend.blob_size(blob_hash) for blob_hash in blob_refs}
+
+        # Least recently written first
+        kept.sort(key=lambda e: e["mtime"])
+        total_bytes = sum(e["size"] for e in kept) + sum(blob_sizes.values())
+        while kept and (len(kept) > max_entries or total_bytes > max_bytes):
+            entry = kept.pop(0)
+            if self._remove_entry(entry):
+                report["evicted"] += 1
+                report["bytes_reclaimed"] += entry["size"]
+            total_bytes -= entry["size"]
+            if entry["blob"]:
+                blob_refs[entry["blob"]] -= 1
+                if blob_refs[entry["blob"]] == 0:
+                    total_bytes -= blob_sizes[entry["blob"]]
+
+        referenced = {blob_hash for blob_hash, refs in blob_refs.items() if refs > 0}
+        sweep_report = self.backend.sweep(referenced)
+        report["blobs"] = sweep_report["blobs"]
+        report["temp_files"] = sweep_report["temp_files"]
+        report["bytes_reclaimed"] += sweep_report["bytes_reclaimed"]
+
+        report["entries"] = len(kept)
+        report["bytes"] = total_bytes
+        return report
+
+    # Async API: disk I/O and (de)serialisation run in a bounded thread pool
+    # so cache access never blocks the event loop
+
+    async def run_io(self, func, *args):
+        """Run a blocking cache call in the cache I/O executor"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=settings.CACHE_IO_WORKERS, thread_name_prefix="cache-io")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def aget_entry(self, cache_key):
+        """Async get_entry; hot memory hits are answered without leaving the loop"""
+        entry, hit = self._memory_hit(cache_key)
+        if hit:
+            return entry[2], entry[3]
+        # Concurrent cold reads of one key share a single disk read
+        return await self._read_flight.run(cache_key, lambda: self.run_io(self.get_entry, cache_key))
+
+    async def aload_cache(self, cache_key):
+        """Async load_cache"""
+        cache_data, _ = await self.aget_entry(cache_key)
+        return cache_data
+
+    async def aget_cache_age(self, cache_key):
+        """Async get_cache_age"""
+        cache_data, cache_time = await self.aget_entry(cache_key)
+        if not cache_data or cache_time is None:
             return None
-api_cache = APICache()
+        return (datetime.now() - cache_time).total_seconds() / 3600
+
+    async def asave_cache(self, cache_key, data, etag=None, last_modified=None, ttl_hours=None, ttl_reason=None):
+        """Async save_cache"""
+        return await self.run_io(self.save_cache, cache_key, data, etag, last_modified, ttl_hours, ttl_reason)
+
+    async def atouch_cache(self, cache_key, ttl_hours=None, ttl_reason=None):
+        """Async touch_cache"""
+        return await self.run_io(self.touch_cache, cache_key, ttl_hours, ttl_reason)
+
+    def shutdown(self):
+        """Stop the I/O executor, waiting for pending writes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+api_cache = APICache(normalise=ensure_projected)
+
+
+async def cache_janitor(context=None):
+    """Periodic job: prune the cache directory and log what was reclaimed"""
+    try:
+        report = await api_cache.run_io(api_cache.enforce_budget)
+    except Exception as e:
+        logger.error(f"Cache janitor failed: {e}")
+        return None
+    logger.info(
+        f"Cache janitor: removed {report['orphaned']} orphaned, {report['expired']} expired, "
+        f"{report['evicted']} evicted, {report['blobs']} blobs, {report['temp_files']} temp files, "
+        f"reclaimed {report['bytes_reclaimed'] / 1024:.1f} KB "
+        f"({report['entries']} entries, {report['bytes'] / 1024:.1f} KB left)"
+    )
+    if breakers.breakers:
+        logger.info(breakers.format_status())
+    if lock_stats["acquired"]:
+        logger.info(format_lock_stats())
+    if breakers.breakers or lock_stats["acquired"]:
+        breakers.write_status()
+    return report
+
+
+upstream_flight = SingleFlight()
+
+
+class UpstreamError(Exception):
+    """Upstream answered with an unexpected HTTP status"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def endpoint_for(cache_key):
+    """Breaker name for a cache key: one per upstream endpoint, so all player stats share one"""
+    if cache_key.startswith("player_stats_"):
+        return "player_stats"
+    return cache_key
+
 
-async def fetch_with_cache(url, cache_key, max_age_hours):
+def is_upstream_outage(error):
     """
-    Fetch data from URL with intelligent caching:
-    1. Check if we have fresh cache data
-    2. If cache is fresh, return it immediately
-    3. If cache is stale or missing, try API
-    4. If API fails, return stale cache as fallback
+    Whether a failure says the endpoint is down: connection errors, timeouts, 5xx and 429.
+
+    Anything else (a 404 for one player, a body that doesn't parse or project)
+    means the endpoint answered and only this key is bad.
     """
+    if isinstance(error, UpstreamError):
+        return error.status is not None and (error.status >= 500 or error.status == 429)
+    return isinstance(error, TRANSPORT_ERRORS)
+
 
-    if api_cache.is_cache_fresh(cache_key, max_age_hours):
-        cache_data = api_cache.load_cache(cache_key)
-        logger.info(f"Using fresh cached data for {cache_key}")
+async def fetch_live(url, cache_key, ttl=(None, None)):
+    """Fetch url from upstream and cache it, recording the (ttl_hours, reason) it was fetched under; raises on any failure"""
+    ttl_hours, ttl_reason = ttl
+    # Revalidate against the cached copy when upstream gave us validators
+    headers = {}
+    cache_data = await api_cache.aload_cache(cache_key)
+    if cache_data:
+        if cache_data.get("etag"):
+            headers["If-None-Match"] = cache_data["etag"]
+        if cache_data.get("last_modified"):
+            headers["If-Modified-Since"] = cache_data["last_modified"]
+
+    response = await upstream_client.get(url, headers=headers)
+    if response.status == 200:
+        # Keep only the fields the handlers use
+        data = await api_cache.run_io(project_payload, cache_key, response.body)
+        # Cache the successful response
+        version = await api_cache.asave_cache(
+            cache_key,
+            data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            ttl_hours=ttl_hours,
+            ttl_reason=ttl_reason
+        )
+        logger.info(f"Fresh data fetched and cached for {cache_key}")
+        return {
+            "success": True,
+            "data": data,
+            "source": "live",
+            "timestamp": datetime.now().isoformat(),
+            "version": version
+        }
+    elif response.status == 304 and headers:
+        cache_data = await api_cache.atouch_cache(cache_key, ttl_hours, ttl_reason)
+        if not cache_data:
+            raise Exception("API returned 304 but cached data is gone")
+        logger.info(f"Upstream data unchanged for {cache_key}, cache marked fresh")
         return {
             "success": True,
             "data": cache_data["data"],
-            "source": "cache",
+            "source": "live",
             "timestamp": cache_data["timestamp"],
-            "cache_age_hours": api_cache.get_cache_age(cache_key)
+            "version": cache_data.get("blob"),
+            "revalidated": True
         }
+    else:
+        logger.warning(f"API returned status {response.status} for {cache_key}")
+        raise UpstreamError(f"API error: {response.status}", status=response.status)
+
+
+async def fetch_guarded(url, cache_key, ttl=(None, None)):
+    """
+    fetch_live behind the endpoint's circuit breaker and the negative cache.
+
+    Raises straight away, without touching the network, while the breaker is
+    open or while a failure of this key is still negatively cached.
+    """
+    error = breakers.negative_cache.get(cache_key)
+    if error:
+        raise UpstreamError(f"{cache_key} failed recently: {error}")
+
+    breaker = breakers.get(endpoint_for(cache_key))
+    breaker.before_call()
+    try:
+        result = await fetch_live(url, cache_key, ttl)
+    except (asyncio.CancelledError, UpstreamThrottled):
+        # Nothing reached upstream, so there is nothing to learn about the endpoint
+        breaker.release_probe()
+        raise
+    except Exception as e:
+        breakers.negative_cache.put(cache_key, e)
+        if is_upstream_outage(e):
+            breaker.record_failure(e)
+        else:
+            # The endpoint answered, it just had nothing usable for this key
+            breaker.record_success()
+        raise
+    breaker.record_success()
+    return result
+
+# Strong references to background refreshes so they aren't garbage collected mid-flight
+_background_tasks = set()
+
+async def _revalidate(url, cache_key, ttl):
+    """Refresh a stale cache entry in the background"""
+    try:
+        await upstream_flight.run(cache_key, lambda: fetch_guarded(url, cache_key, ttl))
+    except CircuitOpenError as e:
+        logger.info(f"Background refresh skipped for {cache_key}: {e}")
+    except Exception as e:
+        logger.warning(f"Background refresh failed for {cache_key}: {describe_error(e)}")
+
+def schedule_revalidation(url, cache_key, ttl=(None, None)):
+    """Start a background refresh for cache_key unless one is already running"""
+    if upstream_flight.is_inflight(cache_key):
+        return
+    task = asyncio.ensure_future(_revalidate(url, cache_key, ttl))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def fetch_with_cache(url, cache_key, max_age_hours, grace_hours=0):
+    """
+    Fetch data from URL with intelligent caching:
+    1. Check if we have fresh cache data
+    2. If cache is fresh, return it immediately
+    3. If cache is stale but within grace_hours, return it immediately
+       and refresh it in the background (stale-while-revalidate)
+    4. If cache is older than that or missing, try API
+    5. If API fails, return stale cache as fallback
+
+    max_age_hours is the configured TTL; ttl_policy may shorten or stretch it
+    depending on how close the nearest match is.
+    """
+
+    await ttl_policy.refresh_schedule(api_cache)
+    ttl = ttl_policy.choose(cache_key, max_age_hours)
+    max_age_hours = ttl[0]
+
+    cache_data, cache_time = await api_cache.aget_entry(cache_key)
+    if cache_data and cache_time is not None:
+        cache_age = (datetime.now() - cache_time).total_seconds() / 3600
+        if cache_age < max_age_hours:
+            logger.info(f"Using fresh cached data for {cache_key}")
+            return {
+                "success": True,
+                "data": cache_data["data"],
+                "source": "cache",
+                "timestamp": cache_data["timestamp"],
+                "version": cache_data.get("blob"),
+                "cache_age_hours": cache_age
+            }
+        if cache_age < max_age_hours + grace_hours:
+            logger.info(f"Using stale cached data for {cache_key} (age: {cache_age:.1f} hours), refreshing in background")
+            schedule_revalidation(url, cache_key, ttl)
+            return {
+                "success": True,
+                "data": cache_data["data"],
+                "source": "cache",
+                "timestamp": cache_data["timestamp"],
+                "version": cache_data.get("blob"),
+                "cache_age_hours": cache_age,
+                "stale": True
+            }
     
-    # First, try to fetch fresh data
+    # First, try to fetch fresh data (concurrent misses share one request)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    # Cache the successful response
-                    api_cache.save_cache(cache_key, data)
-                    logger.info(f"Fresh data fetched and cached for {cache_key}")
-                    return {
-                        "success": True,
-                        "data": data,
-                        "source": "live",
-                        "timestamp": datetime.now().isoformat()
-                    }
-                else:
-                    logger.warning(f"API returned status {response.status} for {cache_key}")
-                    raise Exception(f"API error: {response.status}")
-                    
+        return await upstream_flight.run(cache_key, lambda: fetch_guarded(url, cache_key, ttl))
+
     except Exception as e:
-        logger.error(f"Failed to fetch fresh data for {cache_key}: {e}")
+        if isinstance(e, CircuitOpenError):
+            logger.info(f"Skipping upstream for {cache_key}: {e}")
+        else:
+            logger.error(f"Failed to fetch fresh data for {cache_key}: {describe_error(e)}")
         
         # API failed, try to use cached data
-        cache_data = api_cache.load_cache(cache_key)
+        cache_data, cache_time = await api_cache.aget_entry(cache_key)
         if cache_data:
-            cache_age = api_cache.get_cache_age(cache_key)
-            logger.info(f"Using cached data for {cache_key} (age: {cache_age:.1f} hours)")
+            cache_age = (datetime.now() - cache_time).total_seconds() / 3600 if cache_time else None
+            logger.info(f"Using cached data for {cache_key} (age: {cache_age or 0:.1f} hours)")
             
             return {
                 "success": True,
                 "data": cache_data["data"],
                 "source": "cache",
                 "timestamp": cache_data["timestamp"],
+                "version": cache_data.get("blob"),
                 "cache_age_hours": cache_age
             }
         else:
@@ -145,6 +620,119 @@ async def fetch_with_cache(url, cache_key, max_age_hours):
                 "source": "none"
             }
 
+class CachePrefetcher:
+    """
+    Refresh hot cache entries on the PTB job queue just before their TTL
+    runs out, so interactive handlers almost always get a fresh hit.
+    """
+
+    def __init__(self, lead_minutes=None, jitter_seconds=None, min_interval_minutes=None):
+        self.lead_seconds = (lead_minutes if lead_minutes is not None else settings.PREFETCH_LEAD_MINUTES) * 60
+        self.jitter_seconds = jitter_seconds if jitter_seconds is not None else settings.PREFETCH_JITTER_SECONDS
+        self.min_interval_seconds = (min_interval_minutes if min_interval_minutes is not None else settings.PREFETCH_MIN_INTERVAL_MINUTES) * 60
+        self.targets = {}
+        self.job_queue = None
+
+    def add_target(self, cache_key, url, max_age_hours, interval_minutes=None):
+        """Register an entry to keep warm; interval defaults to TTL minus the lead time"""
+        if not url:
+            logger.info(f"Prefetch target {cache_key} has no URL, skipping")
+            return
+        self.targets[cache_key] = {
+            "url": url,
+            "max_age_hours": max_age_hours,
+            "interval_minutes": interval_minutes,
+            "last_refresh": None,
+            "last_duration": None,
+            "last_error": None,
+            "next_run": None,
+        }
+
+    def _next_delay(self, cache_key, age_hours):
+        """Seconds until the target should be refreshed again, with jitter, given its cache age"""
+        target = self.targets[cache_key]
+        if target["interval_minutes"] is not None:
+            delay = target["interval_minutes"] * 60
+        else:
+            if age_hours is None:
+                delay = 0
+            else:
+                ttl_hours, _ = ttl_policy.choose(cache_key, target["max_age_hours"])
+                delay = (ttl_hours - age_hours) * 3600 - self.lead_seconds
+        # Wake up at the next kickoff at the latest, when matchday TTLs kick in
+        next_match = ttl_policy.next_kickoff()
+        if next_match:
+            delay = min(delay, (next_match["kickoff"] - datetime.now()).total_seconds())
+        delay = max(delay, self.min_interval_seconds if target["last_refresh"] else 0)
+        return max(delay + random.uniform(-self.jitter_seconds, self.jitter_seconds), 1)
+
+    async def _schedule(self, cache_key):
+        """Queue the next refresh of a target"""
+        # Read the entry's age off the event loop (a cold read hits the backend)
+        age_hours = await api_cache.aget_cache_age(cache_key)
+        delay = self._next_delay(cache_key, age_hours)
+        self.targets[cache_key]["next_run"] = datetime.now() + timedelta(seconds=delay)
+        self.job_queue.run_once(self._run, when=delay, data=cache_key, name=f"prefetch_{cache_key}")
+
+    async def start(self, job_queue):
+        """Schedule every registered target on the given PTB JobQueue"""
+        self.job_queue = job_queue
+        for cache_key in self.targets:
+            await self._schedule(cache_key)
+
+    async def refresh(self, cache_key):
+        """Refresh one target now and record how it went"""
+        target = self.targets[cache_key]
+        started = time.monotonic()
+        try:
+            await ttl_policy.refresh_schedule(api_cache)
+            ttl = ttl_policy.choose(cache_key, target["max_age_hours"])
+            await upstream_flight.run(cache_key, lambda: fetch_guarded(target["url"], cache_key, ttl))
+            target["last_error"] = None
+        except Exception as e:
+            target["last_error"] = str(e)
+            logger.warning(f"Prefetch failed for {cache_key}: {e}")
+        target["last_duration"] = time.monotonic() - started
+        target["last_refresh"] = datetime.now()
+
+    async def _run(self, context):
+        """Job callback: refresh the target and queue its next run"""
+        cache_key = context.job.data
+        await self.refresh(cache_key)
+        await self._schedule(cache_key)
+        logger.info(self.format_status(cache_key))
+
+    def status(self):
+        """Last refresh time, duration and error of each target"""
+        return {
+            cache_key: {
+                "last_refresh": target["last_refresh"],
+                "last_duration": target["last_duration"],
+                "last_error": target["last_error"],
+                "next_run": target["next_run"],
+            }
+            for cache_key, target in self.targets.items()
+        }
+
+    def format_status(self, cache_key=None):
+        """Human-readable status lines for the log"""
+        lines = []
+        for key, state in self.status().items():
+            if cache_key is not None and key != cache_key:
+                continue
+            last = state["last_refresh"].strftime("%H:%M:%S") if state["last_refresh"] else "never"
+            duration = f"{state['last_duration']:.2f}s" if state["last_duration"] is not None else "-"
+            next_run = state["next_run"].strftime("%H:%M:%S") if state["next_run"] else "-"
+            result = f"error: {state['last_error']}" if state["last_error"] else "ok"
+            lines.append(f"Prefetch {key}: last {last} ({duration}, {result}), next {next_run}")
+        return "\n".join(lines)
+
+prefetcher = CachePrefetcher()
+prefetcher.add_target("fixtures", settings.CHELSEA_API_URL, settings.FIXTURES_CACHE_HOURS)
+prefetcher.add_target("recent_results", settings.RESULTS_API_URL, settings.RESULTS_CACHE_HOURS)
+prefetcher.add_target("league_table_pl", settings.LEAGUE_TABLE_API_URL, settings.LEAGUE_TABLE_CACHE_HOURS)
+prefetcher.add_target("league_table_cl", settings.CHAMPIONS_LEAGUE_TABLE_URL, settings.LEAGUE_TABLE_CACHE_HOURS)
+
 # def format_cache_notice(result):
 #     """Format a notice about data freshness for users"""
 #     if result["source"] == "live":
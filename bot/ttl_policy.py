@@ -0,0 +1,181 @@
+import re
+import time
+import logging
+import pytz
+import settings
+from datetime import datetime, timedelta
+
+
+logger = logging.getLogger(__name__)
+
+LONDON_TZ = pytz.timezone('Europe/London')
+
+# Which table and stats competition id a match moves
+COMPETITION_TABLES = {
+    "Premier League": "league_table_pl",
+    "UEFA Champions League": "league_table_cl",
+}
+COMPETITION_IDS = {
+    "FA Cup": "1",
+    "Carabao Cup": "2",
+    "UEFA Champions League": "5",
+    "Premier League": "8",
+}
+
+PLAYER_STATS_KEY = re.compile(r"^player_stats_\w+?_season_\d+(_comp_(?P<competition_id>\d+))?$")
+TABLE_KEY = re.compile(r"^league_table_(pl|cl)$")
+
+
+def parse_kickoff(match):
+    """Kickoff of a projected match record as a naive local datetime, or None if unknown"""
+    if match.get("tbc") or match.get("postponed"):
+        return None
+    try:
+        # "Sun 17 Aug 2025" + "14:00", London time; upstream spells September "Sept"
+        kickoff = datetime.strptime(
+            f"{match['kickoff_date'].replace('Sept', 'Sep')} {match['kickoff_time']}",
+            "%a %d %b %Y %H:%M"
+        )
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
+    return LONDON_TZ.localize(kickoff).astimezone().replace(tzinfo=None)
+
+
+def iter_matches(data):
+    """Yield match records from a projected fixtures or recent_results entry"""
+    if not isinstance(data, dict):
+        return
+    yield from data.get("matches", [])
+    if data.get("latest"):
+        yield data["latest"]
+
+
+def describe_match(match):
+    """Short label for log lines and TTL reasons, e.g. "Tottenham v Chelsea (Premier League)" """
+    return f"{match.get('home') or '?'} v {match.get('away') or '?'} ({(match.get('competition') or '').strip()})"
+
+
+class TTLPolicy:
+    """
+    Pick cache TTLs from the match schedule.
+
+    Kickoff times come from the cached fixtures and recent_results entries.
+    Around full time of a match, recent_results, the table of that competition
+    and player stats get short TTLs; when no match is near, every TTL is
+    stretched. Otherwise the configured TTL is used as-is.
+    """
+
+    def __init__(self, enabled=None):
+        self.enabled = enabled if enabled is not None else settings.ADAPTIVE_TTL_ENABLED
+        self.matches = []
+        self._sources = {}
+        self._checked_at = None
+
+    def update_schedule(self, cache_key, cache_data):
+        """Re-read kickoffs when a schedule entry (fixtures / recent_results) has changed"""
+        timestamp = cache_data.get("timestamp") if cache_data else None
+        source = self._sources.get(cache_key)
+        if source is not None and source[0] == timestamp:
+            return
+        matches = []
+        if cache_data:
+            for match in iter_matches(cache_data.get("data")):
+                kickoff = parse_kickoff(match)
+                if kickoff is not None:
+                    matches.append({
+                        "id": match.get("id"),
+                        "kickoff": kickoff,
+                        "competition": (match.get("competition") or "").strip(),
+                        "label": describe_match(match),
+                    })
+        self._sources[cache_key] = (timestamp, matches)
+
+        by_id = {}
+        for _, source_matches in self._sources.values():
+            for match in source_matches:
+                by_id[match["id"] or (match["label"], match["kickoff"])] = match
+        self.matches = sorted(by_id.values(), key=lambda match: match["kickoff"])
+
+    async def refresh_schedule(self, cache):
+        """Pick up new fixtures/results from the cache, at most every SCHEDULE_RECHECK_SECONDS"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < settings.SCHEDULE_RECHECK_SECONDS:
+            return
+        self._checked_at = now
+        for cache_key in ("fixtures", "recent_results"):
+            try:
+                cache_data, _ = await cache.aget_entry(cache_key)
+            except Exception as e:
+                logger.warning(f"Could not read {cache_key} for the TTL policy: {e}")
+                continue
+            self.update_schedule(cache_key, cache_data)
+
+    def _full_time(self, match):
+        return match["kickoff"] + timedelta(hours=settings.MATCH_DURATION_HOURS)
+
+    def _in_window(self, match, now, settle_hours):
+        """Whether now is between kickoff and settle_hours after full time"""
+        return match["kickoff"] <= now <= self._full_time(match) + timedelta(hours=settle_hours)
+
+    def next_kickoff(self, now=None):
+        """The next match that hasn't kicked off yet, or None"""
+        now = now or datetime.now()
+        for match in self.matches:
+            if match["kickoff"] > now:
+                return match
+        return None
+
+    def _nearest_match(self, now):
+        """(match, hours away) of the kickoff closest to now, or (None, None)"""
+        nearest = min(self.matches, key=lambda match: abs(match["kickoff"] - now), default=None)
+        if nearest is None:
+            return None, None
+        return nearest, abs(nearest["kickoff"] - now).total_seconds() / 3600
+
+    def _matchday_ttl(self, cache_key, now):
+        """(ttl_hours, match) if cache_key is in the window of a match, else (None, None)"""
+        if cache_key == "recent_results":
+            for match in self.matches:
+                if self._in_window(match, now, settings.MATCH_SETTLE_HOURS):
+                    return settings.MATCHDAY_RESULTS_CACHE_HOURS, match
+        elif TABLE_KEY.match(cache_key):
+            for match in self.matches:
+                if COMPETITION_TABLES.get(match["competition"]) == cache_key and self._in_window(match, now, settings.MATCH_SETTLE_HOURS):
+                    return settings.MATCHDAY_LEAGUE_TABLE_CACHE_HOURS, match
+        else:
+            stats_key = PLAYER_STATS_KEY.match(cache_key)
+            if stats_key:
+                competition_id = stats_key.group("competition_id")
+                for match in self.matches:
+                    if competition_id and COMPETITION_IDS.get(match["competition"]) != competition_id:
+                        continue
+                    if self._in_window(match, now, settings.MATCHDAY_PLAYER_STATS_SETTLE_HOURS):
+                        return settings.MATCHDAY_PLAYER_STATS_CACHE_HOURS, match
+        return None, None
+
+    def choose(self, cache_key, base_hours, now=None):
+        """Return (ttl_hours, reason) for cache_key given its configured TTL"""
+        if not self.enabled:
+            return base_hours, "fixed"
+        now = now or datetime.now()
+
+        ttl_hours, match = self._matchday_ttl(cache_key, now)
+        if ttl_hours is not None:
+            full_time = self._full_time(match).strftime("%d %b %H:%M")
+            return min(base_hours, ttl_hours), f"matchday: {match['label']}, full time ~{full_time}"
+
+        if not self.matches:
+            return base_hours, "default: no schedule cached"
+
+        match, hours_away = self._nearest_match(now)
+        if hours_away > settings.QUIET_PERIOD_HOURS:
+            next_match = self.next_kickoff(now)
+            upcoming = next_match["kickoff"].strftime("%d %b %H:%M") if next_match else "none scheduled"
+            return base_hours * settings.QUIET_TTL_MULTIPLIER, f"quiet: next kickoff {upcoming}"
+
+        return base_hours, f"default: {match['label']} within {settings.QUIET_PERIOD_HOURS:g}h"
+
+
+ttl_policy = TTLPolicy()
@@ -0,0 +1,214 @@
+import json
+import time
+import random
+import asyncio
+import logging
+import aiohttp
+import settings
+from urllib.parse import urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth another attempt; anything else is returned to the caller as-is
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# Failures of the request itself (no response), retried and counted as outages
+TRANSPORT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+# Shortest time an attempt is given; a request that can't start with this much left isn't sent
+MIN_ATTEMPT_SECONDS = 0.1
+
+
+class UpstreamThrottled(Exception):
+    """The host's rate limit can't grant a request before the request's deadline"""
+
+
+class HTTPSessionManager:
+    """One pooled aiohttp session shared by every upstream call"""
+
+    def __init__(self):
+        self._session = None
+
+    def get_session(self):
+        """Return the shared session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.UPSTREAM_TIMEOUT_SECONDS)
+            )
+            logger.info("Opened shared HTTP session")
+        return self._session
+
+    async def start(self, application=None):
+        """Open the session (usable as a PTB post_init hook)"""
+        self.get_session()
+
+    async def close(self, application=None):
+        """Close the session (usable as a PTB post_shutdown hook)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed shared HTTP session")
+        self._session = None
+
+http_session = HTTPSessionManager()
+
+
+class TokenBucket:
+    """Allow rate requests per second on average, with bursts of up to burst requests"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    async def acquire(self, deadline=None):
+        """
+        Take a token, sleeping until one is available; returns the seconds waited.
+
+        Raises UpstreamThrottled, without taking a token, when none would be
+        available before deadline (a time.monotonic() value).
+        """
+        if self.rate <= 0:
+            return 0
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        wait = max(1 - self.tokens, 0) / self.rate
+        if wait and deadline is not None and now + wait >= deadline:
+            raise UpstreamThrottled(f"rate limit allows no request for {wait:.1f}s, past the deadline")
+        # Reserve the token up front so concurrent callers queue up in order
+        self.tokens -= 1
+        if not wait:
+            return 0
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        return wait
+
+    def release(self):
+        """Give back a token that was taken but not used for a request"""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class UpstreamResponse:
+    """A fully read upstream response"""
+
+    def __init__(self, status, headers, content_type, body):
+        self.status = status
+        self.headers = headers
+        self.content_type = content_type
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class UpstreamClient:
+    """
+    GET requests to upstream hosts over the shared session.
+
+    Every request takes a token from its host's bucket first. Connection
+    errors, timeouts and RETRYABLE_STATUSES are retried with exponential
+    backoff and full jitter (honouring Retry-After), as long as the next
+    attempt still fits in the request's deadline.
+    """
+
+    def __init__(self, session_manager, retries=None, backoff_seconds=None, max_backoff_seconds=None,
+                 rate_per_second=None, burst=None):
+        self.session_manager = session_manager
+        self.retries = retries if retries is not None else settings.UPSTREAM_RETRIES
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else settings.UPSTREAM_BACKOFF_SECONDS
+        self.max_backoff_seconds = max_backoff_seconds if max_backoff_seconds is not None else settings.UPSTREAM_MAX_BACKOFF_SECONDS
+        self.rate_per_second = rate_per_second if rate_per_second is not None else settings.UPSTREAM_RATE_PER_HOST
+        self.burst = burst if burst is not None else settings.UPSTREAM_BURST_PER_HOST
+        self.buckets = {}
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "throttled_seconds": 0.0, "rejected": 0}
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(self.rate_per_second, self.burst)
+        return bucket
+
+    def _backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry number attempt (1-based)"""
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_seconds)
+        return random.uniform(0, min(self.backoff_seconds * 2 ** (attempt - 1), self.max_backoff_seconds))
+
+    @staticmethod
+    def _retry_after(headers):
+        try:
+            return max(float(headers.get("Retry-After")), 0)
+        except (TypeError, ValueError):
+            return None
+
+    async def get(self, url, headers=None, timeout=None, deadline=None):
+        """
+        GET url and return an UpstreamResponse.
+
+        timeout bounds each attempt (default UPSTREAM_TIMEOUT_SECONDS) and
+        deadline the whole call including retries and rate-limit waits
+        (default UPSTREAM_DEADLINE_SECONDS). The last response is returned
+        even if its status is retryable; the last error is raised if no
+        attempt got a response, and UpstreamThrottled if the rate limit
+        left no room for a first attempt.
+        """
+        timeout = timeout if timeout is not None else settings.UPSTREAM_TIMEOUT_SECONDS
+        deadline = time.monotonic() + (deadline if deadline is not None else settings.UPSTREAM_DEADLINE_SECONDS)
+        bucket = self._bucket(url)
+        attempt = 0
+        result = error = None
+        while True:
+            try:
+                waited = await bucket.acquire(deadline - MIN_ATTEMPT_SECONDS)
+                if time.monotonic() + MIN_ATTEMPT_SECONDS > deadline:
+                    bucket.release()
+                    raise UpstreamThrottled("deadline passed while waiting for the rate limit")
+            except UpstreamThrottled:
+                self.stats["rejected"] += 1
+                # On a retry, the last attempt's outcome is more useful than the throttle
+                if error is not None:
+                    raise error
+                if result is not None:
+                    return result
+                raise
+            if waited:
+                self.stats["throttled"] += 1
+                self.stats["throttled_seconds"] += waited
+
+            self.stats["requests"] += 1
+            remaining = deadline - time.monotonic()
+            try:
+                session = self.session_manager.get_session()
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=max(min(timeout, remaining), MIN_ATTEMPT_SECONDS))) as response:
+                    result = UpstreamResponse(response.status, response.headers, response.content_type, await response.read())
+                error = None
+            except TRANSPORT_ERRORS as e:
+                result, error = None, e
+
+            if result is not None and result.status not in RETRYABLE_STATUSES:
+                return result
+
+            attempt += 1
+            delay = self._backoff(attempt, self._retry_after(result.headers) if result is not None else None)
+            if attempt > self.retries or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return result
+
+            self.stats["retries"] += 1
+            reason = f"HTTP {result.status}" if result is not None else (str(error) or type(error).__name__)
+            logger.info(f"Retrying {url} in {delay:.2f}s (attempt {attempt + 1}, {reason})")
+            await asyncio.sleep(delay)
+
+upstream_client = UpstreamClient(http_session)
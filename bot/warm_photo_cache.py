@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script to upload every player photo once at deploy time, so the first stats
+view of each player is already sent by Telegram file_id.
+
+Photos go to the private chat PHOTO_WARMUP_CHAT_ID and the messages are
+deleted again; their file_ids stay valid.
+"""
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import settings
+
+from telegram import Bot
+from models import player_registry
+from photo_cache import photo_manifest, photo_file_ids
+
+async def warm_photo_cache():
+    """Upload the photos that have no file_id for their current version yet"""
+    if not settings.BOT_TOKEN or not settings.PHOTO_WARMUP_CHAT_ID:
+        print("⚠️ BOT_TOKEN and PHOTO_WARMUP_CHAT_ID are required, skipping warm-up")
+        return
+
+    photo_manifest.refresh()
+    photo_file_ids.load()
+    uploaded = 0
+    async with Bot(settings.BOT_TOKEN) as bot:
+        for player in player_registry:
+            photo = photo_manifest.get(player.id)
+            if photo is None:
+                print(f"⚠️ {player.full_name} - No local photo")
+                continue
+            if photo_file_ids.get(player.id, photo.sha256):
+                print(f"✅ {player.full_name} - Already uploaded")
+                continue
+
+            try:
+                message = await photo_file_ids.send(
+                    bot, settings.PHOTO_WARMUP_CHAT_ID, player.id, photo,
+                    disable_notification=True
+                )
+                photo_file_ids.save()
+                await message.delete()
+                uploaded += 1
+                print(f"✅ {player.full_name} - Uploaded")
+            except Exception as e:
+                print(f"❌ {player.full_name} - Error: {e}")
+
+    print(f"ℹ️ {uploaded} photos uploaded, file_ids in {photo_file_ids.path}")
+
+if __name__ == "__main__":
+    print("🔄 Starting player photo warm-up...")
+    asyncio.run(warm_photo_cache())
+    print("✅ Photo warm-up complete!")
@@ -10,11 +10,112 @@ CHAMPIONS_LEAGUE_TABLE_URL = os.getenv('CHAMPIONS_LEAGUE_TABLE_URL')
 RESULTS_API_URL = os.getenv('RESULTS_API_URL')
 PLAYER_STATS_API_URL = os.getenv('PLAYER_STATS_API_URL')
 
+UPSTREAM_TIMEOUT_SECONDS = float(os.getenv('UPSTREAM_TIMEOUT_SECONDS', 10))
+# Retries with exponential backoff and jitter on timeouts, connection errors
+# and 408/429/5xx; the deadline bounds a whole request including retries
+UPSTREAM_RETRIES = int(os.getenv('UPSTREAM_RETRIES', 2))
+UPSTREAM_BACKOFF_SECONDS = float(os.getenv('UPSTREAM_BACKOFF_SECONDS', 0.5))
+UPSTREAM_MAX_BACKOFF_SECONDS = float(os.getenv('UPSTREAM_MAX_BACKOFF_SECONDS', 4))
+UPSTREAM_DEADLINE_SECONDS = float(os.getenv('UPSTREAM_DEADLINE_SECONDS', 15))
+UPSTREAM_BATCH_DEADLINE_SECONDS = float(os.getenv('UPSTREAM_BATCH_DEADLINE_SECONDS', 60))
+# Token bucket per upstream host (requests per second, burst size; 0 = no limit)
+UPSTREAM_RATE_PER_HOST = float(os.getenv('UPSTREAM_RATE_PER_HOST', 5))
+UPSTREAM_BURST_PER_HOST = int(os.getenv('UPSTREAM_BURST_PER_HOST', 10))
+
+# Per-endpoint circuit breakers: open after N consecutive failures, probe again
+# after the reset time (doubling while probes keep failing)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 3))
+BREAKER_RESET_SECONDS = float(os.getenv('BREAKER_RESET_SECONDS', 30))
+BREAKER_MAX_RESET_SECONDS = float(os.getenv('BREAKER_MAX_RESET_SECONDS', 600))
+# How long a failed fetch of one cache key is remembered before retrying it
+NEGATIVE_CACHE_SECONDS = float(os.getenv('NEGATIVE_CACHE_SECONDS', 30))
+# Breaker state snapshot, shown in the admin panel
+UPSTREAM_STATUS_FILE = os.getenv('UPSTREAM_STATUS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'upstream_status.json'))
+
 FIXTURES_CACHE_HOURS = float(os.getenv('FIXTURES_CACHE_HOURS', 2))
 RESULTS_CACHE_HOURS = float(os.getenv('RESULTS_CACHE_HOURS', 0.5))
 PLAYER_STATS_CACHE_HOURS = float(os.getenv('PLAYER_STATS_CACHE_HOURS', 24))
 LEAGUE_TABLE_CACHE_HOURS = float(os.getenv('LEAGUE_TABLE_CACHE_HOURS', 2))
 
+# Stale-while-revalidate windows: how long past the TTL stale data is served
+# immediately while a background refresh runs
+FIXTURES_CACHE_GRACE_HOURS = float(os.getenv('FIXTURES_CACHE_GRACE_HOURS', 6))
+RESULTS_CACHE_GRACE_HOURS = float(os.getenv('RESULTS_CACHE_GRACE_HOURS', 0.25))
+PLAYER_STATS_CACHE_GRACE_HOURS = float(os.getenv('PLAYER_STATS_CACHE_GRACE_HOURS', 24))
+LEAGUE_TABLE_CACHE_GRACE_HOURS = float(os.getenv('LEAGUE_TABLE_CACHE_GRACE_HOURS', 2))
+
+# Adaptive TTLs from the match schedule: short TTLs from kickoff until a while
+# after full time, longer ones when no match is near
+ADAPTIVE_TTL_ENABLED = os.getenv('ADAPTIVE_TTL_ENABLED', '1') == '1'
+SCHEDULE_RECHECK_SECONDS = float(os.getenv('SCHEDULE_RECHECK_SECONDS', 60))
+MATCH_DURATION_HOURS = float(os.getenv('MATCH_DURATION_HOURS', 2))
+MATCH_SETTLE_HOURS = float(os.getenv('MATCH_SETTLE_HOURS', 2))
+MATCHDAY_RESULTS_CACHE_HOURS = float(os.getenv('MATCHDAY_RESULTS_CACHE_HOURS', 0.05))
+MATCHDAY_LEAGUE_TABLE_CACHE_HOURS = float(os.getenv('MATCHDAY_LEAGUE_TABLE_CACHE_HOURS', 0.1))
+MATCHDAY_PLAYER_STATS_CACHE_HOURS = float(os.getenv('MATCHDAY_PLAYER_STATS_CACHE_HOURS', 1))
+MATCHDAY_PLAYER_STATS_SETTLE_HOURS = float(os.getenv('MATCHDAY_PLAYER_STATS_SETTLE_HOURS', 12))
+QUIET_PERIOD_HOURS = float(os.getenv('QUIET_PERIOD_HOURS', 36))
+QUIET_TTL_MULTIPLIER = float(os.getenv('QUIET_TTL_MULTIPLIER', 4))
+
+# Cache storage backend: "file" (bot/cache/) or "sqlite" (shared by every
+# bot process on the host)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'file')
+CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH')
+CACHE_SQLITE_BUSY_TIMEOUT_SECONDS = float(os.getenv('CACHE_SQLITE_BUSY_TIMEOUT_SECONDS', 5))
+
+# Cross-process advisory locks around cache and player photo writes
+FILE_LOCK_TIMEOUT_SECONDS = float(os.getenv('FILE_LOCK_TIMEOUT_SECONDS', 10))
+FILE_LOCK_SLOW_WAIT_SECONDS = float(os.getenv('FILE_LOCK_SLOW_WAIT_SECONDS', 0.1))
+
+# Gzip cache files on disk (version 2 format is compact JSON either way)
+CACHE_COMPRESS = os.getenv('CACHE_COMPRESS', '0') == '1'
+CACHE_COMPRESS_LEVEL = int(os.getenv('CACHE_COMPRESS_LEVEL', 6))
+
+# Keep the raw upstream payload next to the projected record (debugging only,
+# multiplies cache size)
+CACHE_KEEP_RAW = os.getenv('CACHE_KEEP_RAW', '0') == '1'
+
+# On-disk cache budget, enforced by the periodic cache janitor
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 500))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 50 * 1024 * 1024))
+CACHE_MAX_AGE_DAYS = float(os.getenv('CACHE_MAX_AGE_DAYS', 30))
+CACHE_JANITOR_INTERVAL_MINUTES = float(os.getenv('CACHE_JANITOR_INTERVAL_MINUTES', 60))
+
+# Background prefetch of fixtures, results and tables ahead of TTL expiry
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', '1') == '1'
+PREFETCH_LEAD_MINUTES = float(os.getenv('PREFETCH_LEAD_MINUTES', 5))
+PREFETCH_JITTER_SECONDS = float(os.getenv('PREFETCH_JITTER_SECONDS', 30))
+PREFETCH_MIN_INTERVAL_MINUTES = float(os.getenv('PREFETCH_MIN_INTERVAL_MINUTES', 5))
+
+# Threads for cache disk I/O and (de)serialisation off the event loop
+CACHE_IO_WORKERS = int(os.getenv('CACHE_IO_WORKERS', 2))
+
+# In-process memory tier in front of the on-disk API cache
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv('MEMORY_CACHE_MAX_ENTRIES', 128))
+MEMORY_CACHE_RECHECK_SECONDS = float(os.getenv('MEMORY_CACHE_RECHECK_SECONDS', 30))
+# Parsed domain objects (matches, tables, player stats) kept per cache version
+DOMAIN_CACHE_MAX_ENTRIES = int(os.getenv('DOMAIN_CACHE_MAX_ENTRIES', 128))
+# Rendered fixtures / results / table screens kept per cache version
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv('RENDER_CACHE_MAX_ENTRIES', 256))
+
+# Shared upstream HTTP connection pool
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', 100))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', 10))
+HTTP_DNS_CACHE_SECONDS = int(os.getenv('HTTP_DNS_CACHE_SECONDS', 300))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv('HTTP_KEEPALIVE_SECONDS', 60))
+
+# Telegram file_ids of uploaded player photos, so each photo is uploaded once
+# (file_ids are only valid for the bot token that uploaded them)
+PHOTO_FILE_IDS_FILE = os.getenv('PHOTO_FILE_IDS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'photo_file_ids.json'))
+# Private chat that bot/warm_photo_cache.py uploads every player photo to at deploy time
+PHOTO_WARMUP_CHAT_ID = os.getenv('PHOTO_WARMUP_CHAT_ID')
+# Local player photo manifest: how often static/players is rescanned (0 = only at startup)
+# and the size up to which photos are kept in memory
+PHOTO_MANIFEST_RECHECK_SECONDS = float(os.getenv('PHOTO_MANIFEST_RECHECK_SECONDS', 300))
+PHOTO_RESIDENT_MAX_KB = int(os.getenv('PHOTO_RESIDENT_MAX_KB', 256))
+# Lock files for player photo writes, kept out of the static asset directory
+PHOTO_LOCK_DIR = os.getenv('PHOTO_LOCK_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'locks', 'players'))
+
 ADMIN_SECRET_KEY = os.getenv('ADMIN_SECRET_KEY')
 ADMIN_USERNAME = os.getenv('ADMIN_USERNAME')
 ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD')
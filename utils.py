@@ -3,7 +3,7 @@ import pytz
 import logging
 import os
 from supabase import create_client, Client
-from functools import wraps
+from functools import lru_cache, wraps
 import settings
 
 logger = logging.getLogger(__name__)
@@ -57,33 +57,35 @@ def track_user_activity(func):
         return await func(update, context)
     return wrapper
 
+# Resolved once instead of on every conversion
+LONDON_TZ = pytz.timezone('Europe/London')
+AZERBAIJAN_TZ = pytz.timezone('Asia/Baku')
+
+MONTH_NUMBERS = {month: number for number, month in enumerate(settings.MONTHS, 1)}
+# Upstream spells September "Sept", strftime-style "Sep" is accepted too
+MONTH_NUMBERS["Sep"] = MONTH_NUMBERS["Sept"]
+AZ_MONTHS = dict(enumerate(settings.MONTHS.values(), 1))
+# English weekday abbreviations in datetime.weekday() order
+WEEKDAY_KEYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+@lru_cache(maxsize=1024)
 def convert_to_azerbaijan_time(date_str, time_str):
-    """Convert match date and time to Azerbaijan timezone (UTC+4)"""
+    """Convert match date and time to Azerbaijan timezone (UTC+4), memoised by (date, time)"""
     try:
         # Parse the date string (e.g., "Sun 17 Aug 2025")
         parts = date_str.split()
-        day_name = parts[0]
         day = int(parts[1])
-        month = parts[2]
+        month = MONTH_NUMBERS[parts[2]]
         year = int(parts[3])
         
         # Parse time (e.g., "14:00")
         hour, minute = map(int, time_str.split(':'))
         
-        # Create datetime object assuming London (or the source timezone)
-        dt = datetime(year, list(settings.MONTHS.keys()).index(month) + 1, day, hour, minute)
-        # Define timezones
-        london_tz = pytz.timezone('Europe/London')
-        azerbaijan_tz = pytz.timezone('Asia/Baku')
-        
-        # Assume source time is London and localize it
-        london_dt = london_tz.localize(dt)
-        
-        # Convert to Azerbaijan timezone
-        az_dt = london_dt.astimezone(azerbaijan_tz)
-        # Format in Azerbaijani
-        az_day_name = settings.WEEKDAYS.get(day_name, day_name)
-        az_month = settings.MONTHS.get(month, month)
+        # Source time is London; weekday and month follow the Baku date, which can be a day later
+        az_dt = LONDON_TZ.localize(datetime(year, month, day, hour, minute)).astimezone(AZERBAIJAN_TZ)
+        weekday = WEEKDAY_KEYS[az_dt.weekday()]
+        az_day_name = settings.WEEKDAYS.get(weekday, weekday)
+        az_month = AZ_MONTHS[az_dt.month]
         
         formatted_date = f"{az_day_name} {az_dt.day} {az_month} {az_dt.year}"
         formatted_time = f"{az_dt.hour:02d}:{az_dt.minute:02d}"
@@ -91,4 +93,8 @@ def convert_to_azerbaijan_time(date_str, time_str):
         return formatted_date, formatted_time
     except Exception:
         # Fallback to original if parsing fails
-        return date_str, time_str
\ No newline at end of file
+        return date_str, time_str
+
+def convert_kickoffs_to_azerbaijan_time(matches):
+    """(date, time) in Azerbaijan time for each match of a list, in order"""
+    return [convert_to_azerbaijan_time(match.kickoff_date, match.kickoff_time) for match in matches]